@@ -7,18 +7,66 @@ Advanced command-line tool for batch image compression with extensive options.
 import argparse
 import sys
 import os
+import io
 from pathlib import Path
 import json
-from typing import List, Dict
+import glob
+import re
+from typing import List, Dict, Iterator, Optional, Tuple
 import time
-from image_compressor import ImageCompressor, format_size
+from stat import S_ISDIR, S_ISREG
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from itertools import repeat
+from operator import itemgetter
+from image_compressor import (EXCLUDE_DIRS, ImageCompressor, _compress_one_worker,
+                              _init_worker, format_size)
+
+# Maximum threads used to scan multiple input directories
+SCAN_WORKERS = 8
+
+# Progress lines buffered before a write when stdout is not a terminal
+PROGRESS_BATCH_LINES = 64
+
 
 class CLIImageCompressor:
     """Command-line interface for the image compressor."""
     
+    # ASCII stand-ins for emoji on consoles that cannot encode them
+    EMOJI_REPLACEMENTS = {
+        '✅': '[SUCCESS]',
+        '❌': '[ERROR]',
+        '🔧': '[REPAIR]',
+        '📊': '[INFO]',
+        '📁': '[FOLDER]',
+        '📦': '[PACKAGE]',
+        '⚠️': '[WARNING]',
+        '📏': '[SIZE]',
+        '🎯': '[TARGET]',
+        '💡': '[TIP]',
+        '🚀': '[ROCKET]',
+        '🧪': '[TEST]',
+        '🔄': '[PROGRESS]',
+        '🔍': '[SEARCH]',
+        '📈': '[STATS]',
+        '⏱️': '[TIME]',
+        '🛑': '[STOP]'
+    }
+    EMOJI_PATTERN = re.compile('|'.join(map(re.escape, EMOJI_REPLACEMENTS)))
+    
     def __init__(self):
         self.compressor = ImageCompressor()
         self.start_time = None
+        self._summary = None
+        self._summary_source = None
+        self._made_dirs = set()  # Output directories already created this run
+        
+        # Probe the console encoding once instead of on every message
+        self._needs_ascii_fallback = False
+        try:
+            ''.join(self.EMOJI_REPLACEMENTS).encode(getattr(sys.stdout, 'encoding', None) or 'utf-8')
+        except (UnicodeEncodeError, LookupError):
+            self._needs_ascii_fallback = True
     
     def safe_print(self, message, file=None):
         """Safely print message handling Unicode encoding issues."""
@@ -29,38 +77,21 @@ class CLIImageCompressor:
                 print(self.format_message(message))
         except UnicodeEncodeError:
             # If still having issues, strip all non-ASCII characters
-            ascii_message = message.encode('ascii', 'ignore').decode('ascii')
+            ascii_message = self.format_message(message).encode('ascii', 'ignore').decode('ascii')
             if file:
                 print(ascii_message, file=file)
             else:
                 print(ascii_message)
+    
+    def format_message(self, message: str) -> str:
         """Format message for console output, handling encoding issues."""
-        try:
-            # Try to encode with console encoding
-            if hasattr(sys.stdout, 'encoding') and sys.stdout.encoding:
-                message.encode(sys.stdout.encoding)
-            return message
-        except (UnicodeEncodeError, AttributeError):
-            # Fallback: replace problematic Unicode characters
-            replacements = {
-                '✅': '[SUCCESS]',
-                '❌': '[ERROR]',
-                '🔧': '[REPAIR]',
-                '📊': '[INFO]',
-                '📁': '[FOLDER]',
-                '📦': '[PACKAGE]',
-                '⚠️': '[WARNING]',
-                '📏': '[SIZE]',
-                '🎯': '[TARGET]',
-                '💡': '[TIP]',
-                '�': '[ROCKET]',
-                '🧪': '[TEST]'
-            }
-            
-            for unicode_char, replacement in replacements.items():
-                message = message.replace(unicode_char, replacement)
-            
+        if not self._needs_ascii_fallback:
             return message
+        
+        # Fallback: replace problematic Unicode characters in one pass
+        return self.EMOJI_PATTERN.sub(
+            lambda match: self.EMOJI_REPLACEMENTS[match.group(0)], message
+        )
     
     def create_parser(self) -> argparse.ArgumentParser:
         """Create and configure argument parser."""
@@ -76,11 +107,13 @@ Examples:
   %(prog)s *.jpg -s 2                          # Compress to max 2MB file size
   %(prog)s folder/ -r --format-stats           # Show format statistics
   %(prog)s image.jpg --dry-run                 # Preview compression without saving
+  %(prog)s --serve < jobs.jsonl                # Run many jobs in one process
             """
         )
         
         # Input arguments
-        parser.add_argument('inputs', nargs='+', 
+        # Required unless --serve; main() enforces that
+        parser.add_argument('inputs', nargs='*', 
                           help='Input image files or directories to compress')
         
         # Output options
@@ -116,6 +149,9 @@ Examples:
                                     help='Number of parallel processes (default: CPU count)')
         processing_group.add_argument('--preserve-structure', action='store_true',
                                     help='Preserve directory structure in output')
+        processing_group.add_argument('--serve', action='store_true',
+                                    help='Read jobs from stdin, one JSON list of arguments per line, '
+                                         'and answer each with a JSON line; saves a Python start per job')
         
         # Filter options
         filter_group = parser.add_argument_group('Filter Options')
@@ -126,6 +162,10 @@ Examples:
         filter_group.add_argument('--formats', nargs='+',
                                 choices=['jpg', 'jpeg', 'png', 'webp', 'tiff', 'bmp'],
                                 help='Only process specific formats')
+        filter_group.add_argument('--exclude-dir', action='append', default=[], metavar='NAME',
+                                help='Skip directories with this name when scanning '
+                                     '(repeatable; hidden directories, .git, __pycache__, '
+                                     '.venv and node_modules are always skipped)')
         
         # Information options
         info_group = parser.add_argument_group('Information Options')
@@ -147,56 +187,142 @@ Examples:
         
         return parser
     
+    def _write_progress(self, lines: List[str]):
+        """Write buffered progress lines in one call and clear the buffer"""
+        if lines:
+            text = self.format_message(''.join(lines))
+            try:
+                sys.stdout.write(text)
+            except UnicodeEncodeError:
+                sys.stdout.write(text.encode('ascii', 'ignore').decode('ascii'))
+            sys.stdout.flush()
+            lines.clear()
+    
     def collect_files(self, inputs: List[str], recursive: bool = False,
                      formats: List[str] = None, min_size: float = None,
-                     max_size: float = None) -> List[str]:
-        """Collect image files from input paths with filtering."""
+                     max_size: float = None,
+                     need_sizes: bool = True,
+                     exclude_dirs: List[str] = None) -> List[Tuple[str, Optional[int]]]:
+        """Collect image files from input paths with filtering.
+        
+        Returns a sorted list of ``(path, size_in_bytes)`` tuples so callers
+        can reuse the size without stat'ing the file again. With
+        ``need_sizes=False`` files found by a directory scan are not stat'ed
+        and carry ``None`` instead; size filters always force the lookup.
+        """
+        need_sizes = need_sizes or bool(min_size or max_size)
+        exclude_dirs = EXCLUDE_DIRS.union(exclude_dirs or ())
         files = []
-        supported_exts = self.compressor.SUPPORTED_FORMATS
+        # Overlapping inputs can name the same file twice; dedup as we go
+        seen = set()
         
-        # Filter by specified formats if given
+        # Filter by specified formats if given; suffixes are always
+        # lowercased before matching
         if formats:
-            supported_exts = {f'.{fmt.lower()}' for fmt in formats}
-            supported_exts.update({f'.{fmt.upper()}' for fmt in formats})
+            supported_exts = frozenset(f'.{fmt.lower()}' for fmt in formats)
+        else:
+            supported_exts = frozenset(self.compressor.SUPPORTED_FORMATS)
+        # Same set without the leading dot, for matching raw DirEntry names
+        supported_suffixes = frozenset(ext[1:] for ext in supported_exts)
         
+        directories = []
         for input_path in inputs:
             path = Path(input_path)
+            try:
+                # One stat per input tells us file vs directory and the size
+                st = os.stat(path)
+            except OSError:
+                st = None
             
-            if path.is_file():
-                if path.suffix.lower() in supported_exts:
-                    files.append(str(path))
-            elif path.is_dir():
-                if recursive:
-                    pattern = "**/*"
-                else:
-                    pattern = "*"
-                
-                for ext in supported_exts:
-                    files.extend(str(p) for p in path.glob(f"{pattern}{ext}") if p.is_file())
+            if st is not None and S_ISREG(st.st_mode):
+                file = str(path)
+                if path.suffix.lower() in supported_exts and file not in seen:
+                    seen.add(file)
+                    files.append((file, st.st_size))
+            elif st is not None and S_ISDIR(st.st_mode):
+                directories.append(str(path))
             else:
                 # Handle glob patterns
-                import glob
                 matched_files = glob.glob(str(path))
                 for file in matched_files:
-                    if Path(file).suffix.lower() in supported_exts:
-                        files.append(file)
+                    if file not in seen and Path(file).suffix.lower() in supported_exts:
+                        try:
+                            files.append((file, os.stat(file).st_size))
+                        except OSError:
+                            continue
+                        seen.add(file)
+        
+        for file, size in self._scan_directories(directories, recursive, supported_suffixes,
+                                                 need_sizes, exclude_dirs):
+            if file not in seen:
+                seen.add(file)
+                files.append((file, size))
         
         # Apply size filters
         if min_size or max_size:
             filtered_files = []
-            for file in files:
-                try:
-                    size_mb = os.path.getsize(file) / (1024 * 1024)
-                    if min_size and size_mb < min_size:
-                        continue
-                    if max_size and size_mb > max_size:
-                        continue
-                    filtered_files.append(file)
-                except OSError:
+            for file, size in files:
+                size_mb = size / (1024 * 1024)
+                if min_size and size_mb < min_size:
                     continue
+                if max_size and size_mb > max_size:
+                    continue
+                filtered_files.append((file, size))
             files = filtered_files
         
-        return sorted(set(files))
+        files.sort(key=itemgetter(0))
+        return files
+    
+    def _scan_directories(self, directories: List[str], recursive: bool,
+                          supported_suffixes,
+                          need_sizes: bool = True,
+                          exclude_dirs=EXCLUDE_DIRS) -> List[Tuple[str, Optional[int]]]:
+        """Scan several directories, overlapping their stat calls in threads."""
+        if len(directories) <= 1:
+            return [entry for directory in directories
+                    for entry in self._scan_directory(directory, recursive, supported_suffixes,
+                                                      need_sizes, exclude_dirs)]
+        
+        # stat() releases the GIL, so threads help on slow or network mounts
+        files = []
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(directories))) as executor:
+            scans = executor.map(
+                lambda directory: list(self._scan_directory(directory, recursive, supported_suffixes,
+                                                            need_sizes, exclude_dirs)),
+                directories
+            )
+            for found in scans:
+                files.extend(found)
+        return files
+    
+    def _scan_directory(self, directory: str, recursive: bool,
+                        supported_suffixes,
+                        need_sizes: bool = True,
+                        exclude_dirs=EXCLUDE_DIRS) -> Iterator[Tuple[str, Optional[int]]]:
+        """Walk a directory once, yielding ``(path, size)`` for matching files.
+        
+        ``supported_suffixes`` holds lowercase extensions without the dot.
+        The size is ``None`` unless ``need_sizes`` is set, since on most
+        filesystems ``entry.stat()`` is the only syscall made per file.
+        Hidden directories and names in ``exclude_dirs`` are not entered.
+        """
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if (recursive and entry.name not in exclude_dirs
+                                    and not entry.name.startswith('.')):
+                                yield from self._scan_directory(entry.path, recursive, supported_suffixes,
+                                                                need_sizes, exclude_dirs)
+                            continue
+                        stem, _, suffix = entry.name.rpartition('.')
+                        if stem and suffix.lower() in supported_suffixes and entry.is_file():
+                            yield entry.path, entry.stat().st_size if need_sizes else None
+                    except OSError:
+                        continue
+        except OSError:
+            return
     
     def determine_output_path(self, input_path: str, output_dir: str = None,
                             suffix: str = '_compressed', target_format: str = None,
@@ -222,14 +348,51 @@ Examples:
         else:
             output_path = input_file.parent
         
-        # Create output directory if it doesn't exist
-        output_path.mkdir(parents=True, exist_ok=True)
+        # Create output directory if it doesn't exist; many files share one,
+        # so only the first of them pays for the mkdir
+        if output_path not in self._made_dirs:
+            output_path.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.add(output_path)
         
         return str(output_path / output_name)
     
+    def summarize_results(self, results: List[Dict]) -> Dict:
+        """Aggregate batch totals in a single pass and cache them on self._summary."""
+        successful = failed = repaired = 0
+        total_original = total_compressed = 0
+        
+        for result in results:
+            if result.get('success', False):
+                successful += 1
+                total_original += result.get('original_size', 0)
+                total_compressed += result.get('compressed_size', 0)
+            else:
+                failed += 1
+            if result.get('was_auto_repaired', False):
+                repaired += 1
+        
+        self._summary_source = results
+        self._summary = {
+            'total_files': len(results),
+            'successful': successful,
+            'failed': failed,
+            'repaired': repaired,
+            'total_original': total_original,
+            'total_compressed': total_compressed,
+        }
+        return self._summary
+    
+    def _get_summary(self, results: List[Dict]) -> Dict:
+        """Return the cached summary for results, computing it if needed."""
+        if self._summary is None or self._summary_source is not results:
+            return self.summarize_results(results)
+        return self._summary
+    
     def print_results(self, results: List[Dict], args: argparse.Namespace,
                      elapsed_time: float):
         """Print compression results based on output format."""
+        self.summarize_results(results)
+        
         if args.json:
             self.print_json_results(results, elapsed_time)
         else:
@@ -237,33 +400,36 @@ Examples:
     
     def print_json_results(self, results: List[Dict], elapsed_time: float):
         """Print results in JSON format."""
-        successful = [r for r in results if r.get('success', False)]
-        failed = [r for r in results if not r.get('success', False)]
-        
-        total_original = sum(r.get('original_size', 0) for r in successful)
-        total_compressed = sum(r.get('compressed_size', 0) for r in successful)
-        
-        output = {
-            'summary': {
-                'total_files': len(results),
-                'successful': len(successful),
-                'failed': len(failed),
-                'elapsed_time_seconds': elapsed_time,
-                'total_original_size_bytes': total_original,
-                'total_compressed_size_bytes': total_compressed,
-                'total_size_reduction_bytes': total_original - total_compressed,
-                'average_compression_ratio': ((total_original - total_compressed) / total_original * 100) if total_original > 0 else 0
-            },
-            'results': results
+        stats = self._get_summary(results)
+        total_original = stats['total_original']
+        total_compressed = stats['total_compressed']
+        
+        summary = {
+            'total_files': stats['total_files'],
+            'successful': stats['successful'],
+            'failed': stats['failed'],
+            'elapsed_time_seconds': elapsed_time,
+            'total_original_size_bytes': total_original,
+            'total_compressed_size_bytes': total_compressed,
+            'total_size_reduction_bytes': total_original - total_compressed,
+            'average_compression_ratio': ((total_original - total_compressed) / total_original * 100) if total_original > 0 else 0
         }
         
-        print(json.dumps(output, indent=2))
+        # Stream one result at a time instead of serializing the whole
+        # document into a single string; the layout matches indent=2.
+        write = sys.stdout.write
+        write('{\n  "summary": ')
+        write(json.dumps(summary, indent=2).replace('\n', '\n  '))
+        write(',\n  "results": [')
+        for i, result in enumerate(results):
+            write(',\n    ' if i else '\n    ')
+            write(json.dumps(result, indent=2).replace('\n', '\n    '))
+        write('\n  ]\n}\n' if results else ']\n}\n')
     
     def print_text_results(self, results: List[Dict], args: argparse.Namespace,
                           elapsed_time: float):
         """Print results in human-readable text format."""
-        successful = [r for r in results if r.get('success', False)]
-        failed = [r for r in results if not r.get('success', False)]
+        stats = self._get_summary(results)
         
         if not args.quiet:
             self.safe_print(f"\n📊 Compression Results")
@@ -274,8 +440,8 @@ Examples:
                 for result in results:
                     if result.get('success', False):
                         self.safe_print(f"✅ {Path(result['input_path']).name}")
-                        print(f"   {format_size(result['original_size'])} → {format_size(result['compressed_size'])} "
-                              f"({result['compression_ratio']:.1f}% reduction)")
+                        self.safe_print(f"   {format_size(result['original_size'])} → {format_size(result['compressed_size'])} "
+                                        f"({result['compression_ratio']:.1f}% reduction)")
                         
                         # Show auto-repair information if applicable
                         if result.get('was_auto_repaired', False):
@@ -286,40 +452,42 @@ Examples:
                         self.safe_print(f"❌ {Path(result['input_path']).name}: {result['error']}")
                         # Show suggestions if available
                         if 'suggestions' in result and result['suggestions']:
-                            print(f"   💡 Suggestions:")
+                            self.safe_print(f"   💡 Suggestions:")
                             for suggestion in result['suggestions']:
-                                print(f"      • {suggestion}")
+                                self.safe_print(f"      • {suggestion}")
                 print()
         
         # Summary statistics
-        if successful:
-            total_original = sum(r['original_size'] for r in successful)
-            total_compressed = sum(r['compressed_size'] for r in successful)
+        if stats['successful']:
+            total_original = stats['total_original']
+            total_compressed = stats['total_compressed']
             total_reduction = total_original - total_compressed
             avg_compression = (total_reduction / total_original * 100) if total_original > 0 else 0
             
-            self.safe_print(f"✅ Successfully processed: {len(successful)}/{len(results)} files")
+            self.safe_print(f"✅ Successfully processed: {stats['successful']}/{stats['total_files']} files")
             self.safe_print(f"📁 Total size reduction: {format_size(total_reduction)} ({avg_compression:.1f}%)")
             self.safe_print(f"📊 Original total: {format_size(total_original)}")
             self.safe_print(f"📦 Compressed total: {format_size(total_compressed)}")
         
-        if failed and not args.quiet:
-            self.safe_print(f"❌ Failed: {len(failed)} files")
+        if stats['failed'] and not args.quiet:
+            self.safe_print(f"❌ Failed: {stats['failed']} files")
             if args.verbose:
-                for result in failed:
+                for result in results:
+                    if result.get('success', False):
+                        continue
                     print(f"   {Path(result['input_path']).name}: {result['error']}")
                     if 'suggestions' in result and result['suggestions']:
-                        print(f"      💡 Try:")
+                        self.safe_print(f"      💡 Try:")
                         for suggestion in result['suggestions']:
-                            print(f"         • {suggestion}")
+                            self.safe_print(f"         • {suggestion}")
             else:
                 print(f"   Run with --verbose to see detailed error information")
         
         # Format statistics
-        if args.format_stats and successful:
-            self.print_format_stats(successful)
+        if args.format_stats and stats['successful']:
+            self.print_format_stats([r for r in results if r.get('success', False)])
         
-        print(f"⏱️  Processing time: {elapsed_time:.2f} seconds")
+        self.safe_print(f"⏱️  Processing time: {elapsed_time:.2f} seconds")
     
     def print_format_stats(self, results: List[Dict]):
         """Print statistics grouped by format."""
@@ -339,7 +507,7 @@ Examples:
             stats['total_original'] += result.get('original_size', 0)
             stats['total_compressed'] += result.get('compressed_size', 0)
         
-        print(f"\n📈 Format Statistics")
+        self.safe_print(f"\n📈 Format Statistics")
         print("-" * 30)
         
         for fmt, stats in format_stats.items():
@@ -352,32 +520,39 @@ Examples:
     def run(self, args: argparse.Namespace) -> int:
         """Run the compression with given arguments."""
         self.start_time = time.time()
+        # Directories made by an earlier run may have been removed since
+        self._made_dirs = set()
         
         try:
-            # Collect files
-            files = self.collect_files(
+            # Collect files along with their sizes
+            sized_files = self.collect_files(
                 args.inputs,
                 recursive=args.recursive,
                 formats=args.formats,
                 min_size=args.min_size,
-                max_size=args.max_size
+                max_size=args.max_size,
+                # Only the dry-run listing reports sizes
+                need_sizes=args.dry_run,
+                exclude_dirs=args.exclude_dir
             )
             
+            files = [file_path for file_path, _ in sized_files]
+            
             if not files:
                 self.safe_print("❌ No image files found matching criteria.", file=sys.stderr)
                 return 1
             
             if not args.quiet:
-                print(f"📁 Found {len(files)} image files to process")
+                self.safe_print(f"📁 Found {len(files)} image files to process")
                 if not getattr(args, 'no_auto_repair', False):
-                    print("🔧 Auto-repair enabled for corrupted images")
+                    self.safe_print("🔧 Auto-repair enabled for corrupted images")
             
             # Dry run mode
             if args.dry_run:
-                print("\n🔍 Dry Run - Files that would be processed:")
-                for file in files:
-                    size = format_size(os.path.getsize(file))
-                    print(f"  {Path(file).name} ({size})")
+                lines = ["\n🔍 Dry Run - Files that would be processed:"]
+                lines.extend(f"  {Path(file).name} ({format_size(file_size)})"
+                             for file, file_size in sized_files)
+                self.safe_print("\n".join(lines))
                 return 0
             
             # Initialize compressor with auto-repair setting
@@ -390,15 +565,10 @@ Examples:
                 if input_path.is_dir():
                     base_input_dir = str(input_path)
             
-            # Process files
-            results = []
-            for i, file_path in enumerate(files):
-                if not args.quiet and not args.json:
-                    print(f"🔄 Processing {i+1}/{len(files)}: {Path(file_path).name}")
-                
-                # Determine output path
-                suffix = '' if args.no_suffix else args.suffix
-                output_path = self.determine_output_path(
+            # Determine output paths up front so workers only compress
+            suffix = '' if args.no_suffix else args.suffix
+            output_paths = [
+                self.determine_output_path(
                     file_path,
                     args.output,
                     suffix,
@@ -406,52 +576,135 @@ Examples:
                     args.preserve_structure,
                     base_input_dir
                 )
-                
-                # Compress image
-                result = self.compressor.compress_image(
-                    input_path=file_path,
-                    output_path=output_path,
-                    quality_preset=args.quality,
-                    target_format=args.format,
-                    preserve_exif=not args.no_exif,
-                    max_size_mb=args.size
-                )
-                
-                results.append(result)
+                for file_path in files
+            ]
+            
+            compress_kwargs = {
+                'quality_preset': args.quality,
+                'target_format': args.format,
+                'preserve_exif': not args.no_exif,
+                'max_size_mb': args.size
+            }
+            
+            # Never more workers than files; chunksize below uses the same count
+            workers = min(args.parallel or os.cpu_count() or 1, len(files))
+            
+            # Process files
+            results = []
+            show_progress = not args.quiet and not args.json
+            # Interactive terminals get every line immediately; redirected
+            # output is written in batches to avoid a flush per file
+            progress_batch = 1 if sys.stdout.isatty() else PROGRESS_BATCH_LINES
+            progress = []
+            total = len(files)
+            if len(files) == 1 or workers == 1:
+                # Skip pool startup cost when there is nothing to parallelize
+                for i, (file_path, output_path) in enumerate(zip(files, output_paths)):
+                    if show_progress:
+                        progress.append(f"🔄 Processing {i+1}/{total}: {os.path.basename(file_path)}\n")
+                        if len(progress) >= progress_batch:
+                            self._write_progress(progress)
+                    
+                    result = self.compressor.compress_image(file_path, output_path,
+                                                            **compress_kwargs)
+                    results.append(result)
+            else:
+                chunksize = max(1, len(files) // (4 * workers))
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(self.compressor.auto_repair,)) as executor:
+                    completed = executor.map(_compress_one_worker, files, output_paths,
+                                             repeat(compress_kwargs), chunksize=chunksize)
+                    for i, (file_path, result) in enumerate(zip(files, completed)):
+                        if show_progress:
+                            progress.append(f"🔄 Processed {i+1}/{total}: {os.path.basename(file_path)}\n")
+                            if len(progress) >= progress_batch:
+                                self._write_progress(progress)
+                        results.append(result)
+            self._write_progress(progress)
             
             # Print results
             elapsed_time = time.time() - self.start_time
             self.print_results(results, args, elapsed_time)
             
             # Show auto-repair summary if any files were repaired
-            repaired_count = len([r for r in results if r.get('was_auto_repaired', False)])
+            repaired_count = self._summary['repaired']
             if repaired_count > 0 and not args.quiet:
-                print(f"\n🔧 Auto-repair summary: {repaired_count} file(s) were automatically repaired")
+                self.safe_print(f"\n🔧 Auto-repair summary: {repaired_count} file(s) were automatically repaired")
             
             # Return appropriate exit code
-            failed_count = len([r for r in results if not r.get('success', False)])
-            return 1 if failed_count > 0 else 0
+            return 1 if self._summary['failed'] > 0 else 0
             
         except KeyboardInterrupt:
-            print("\n🛑 Compression interrupted by user.", file=sys.stderr)
+            self.safe_print("\n🛑 Compression interrupted by user.", file=sys.stderr)
             return 130
         except Exception as e:
             self.safe_print(f"❌ Error: {e}", file=sys.stderr)
             return 1
 
+def _parse_job_args(parser: argparse.ArgumentParser, argv: List[str] = None) -> argparse.Namespace:
+    """Parse one command line, requiring inputs unless it asks for --serve."""
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.serve:
+        parser.error('the following arguments are required: inputs')
+    
+    # Handle conflicting arguments
+    if hasattr(args, 'quiet') and hasattr(args, 'verbose'):
+        # This is handled by mutually_exclusive_group, but just in case
+        if args.quiet and args.verbose:
+            args.verbose = False
+    return args
+
+
+def serve(parser: argparse.ArgumentParser) -> int:
+    """Answer jobs from stdin until EOF, one JSON reply line per job.
+    
+    A job is a JSON list of command-line arguments, e.g.
+    ``["photo.jpg", "-q", "high"]``; the reply is
+    ``{"exit_code": ..., "stdout": ..., "stderr": ...}`` with whatever that
+    job would have printed (log records still go to this process's stderr).
+    Python and Pillow start once for all of them; each job gets its own
+    CLIImageCompressor, so it behaves like a separate invocation.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        
+        # Built before stdout is redirected, so it probes the real console
+        cli = CLIImageCompressor()
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                job = json.loads(line)
+                if not isinstance(job, list):
+                    raise ValueError('a job must be a JSON list of arguments')
+                args = _parse_job_args(parser, [str(arg) for arg in job])
+                if args.serve:
+                    raise ValueError('--serve cannot be nested')
+                exit_code = cli.run(args)
+            except SystemExit as e:  # argparse usage errors and --help
+                exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except ValueError as e:
+                print(f"[ERROR] Bad job: {e}", file=sys.stderr)
+                exit_code = 2
+        
+        sys.stdout.write(json.dumps({
+            'exit_code': exit_code,
+            'stdout': out.getvalue(),
+            'stderr': err.getvalue()
+        }) + '\n')
+        sys.stdout.flush()
+    return 0
+
+
 def main():
     """Main entry point for the CLI application."""
     try:
         cli = CLIImageCompressor()
         parser = cli.create_parser()
-        args = parser.parse_args()
-        
-        # Handle conflicting arguments
-        if hasattr(args, 'quiet') and hasattr(args, 'verbose'):
-            # This is handled by mutually_exclusive_group, but just in case
-            if args.quiet and args.verbose:
-                args.verbose = False
+        args = _parse_job_args(parser)
         
+        if args.serve:
+            return serve(parser)
         return cli.run(args)
     except UnicodeEncodeError as e:
         # Handle Unicode encoding issues gracefully
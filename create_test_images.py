@@ -4,7 +4,7 @@ Creates sample images for testing the compression tools.
 """
 
 import os
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 import random
 import numpy as np
 
@@ -43,34 +43,44 @@ def create_test_images(output_dir="test_images"):
                 dimensions = f"{img.width}x{img.height}"
             print(f"  📁 {filename}: {dimensions}, {size/1024/1024:.1f} MB")
 
+# Rows generated per pass in create_photo_like_image
+PHOTO_BAND_ROWS = 256
+
+def _fill_photo_band(band, y0, width, height):
+    """Fill a horizontal band of the photo-like gradient, starting at row y0."""
+    rows = band.shape[0]
+    yy, xx = np.mgrid[y0:y0 + rows, 0:width].astype(np.float32)
+    
+    # Distance from center
+    center_x, center_y = width // 2, height // 2
+    distance = np.hypot(xx - center_x, yy - center_y)
+    max_distance = np.hypot(width, height)
+    falloff = distance / max_distance
+    
+    # Color based on distance and position
+    values = np.empty((rows, width, 3), dtype=np.int16)
+    values[..., 0] = 255 * (1 - falloff) * (xx / width)
+    values[..., 1] = 255 * (yy / height) * (1 - falloff)
+    values[..., 2] = 255 * falloff * (1 - yy / height)
+    
+    # Add some noise (one offset per pixel, shared by all channels)
+    values += np.random.randint(-20, 21, size=(rows, width, 1), dtype=np.int16)
+    
+    np.clip(values, 0, 255, out=values)
+    band[...] = values
+
 def create_photo_like_image(output_dir, filename, size):
     """Create a photo-like image with gradients and noise."""
     width, height = size
     
-    # Create base gradient
-    img = Image.new('RGB', size)
-    draw = ImageDraw.Draw(img)
+    # Create radial gradient band by band to bound temporary memory
+    array = np.empty((height, width, 3), dtype=np.uint8)
+    for y0 in range(0, height, PHOTO_BAND_ROWS):
+        y1 = min(y0 + PHOTO_BAND_ROWS, height)
+        _fill_photo_band(array[y0:y1], y0, width, height)
     
-    # Create radial gradient
-    for y in range(height):
-        for x in range(width):
-            # Distance from center
-            center_x, center_y = width // 2, height // 2
-            distance = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
-            max_distance = (width ** 2 + height ** 2) ** 0.5
-            
-            # Color based on distance and position
-            red = int(255 * (1 - distance / max_distance) * (x / width))
-            green = int(255 * (y / height) * (1 - distance / max_distance))
-            blue = int(255 * (distance / max_distance) * (1 - y / height))
-            
-            # Add some noise
-            noise = random.randint(-20, 20)
-            red = max(0, min(255, red + noise))
-            green = max(0, min(255, green + noise))
-            blue = max(0, min(255, blue + noise))
-            
-            img.putpixel((x, y), (red, green, blue))
+    img = Image.fromarray(array, 'RGB')
+    draw = ImageDraw.Draw(img)
     
     # Add some geometric shapes
     draw.ellipse([width//4, height//4, 3*width//4, 3*height//4], 
@@ -139,71 +149,80 @@ def create_transparent_image(output_dir, filename, size):
 def create_pattern_image(output_dir, filename, size):
     """Create a complex pattern image."""
     width, height = size
-    img = Image.new('RGB', size)
     
-    # Create numpy array for complex patterns
-    array = np.zeros((height, width, 3), dtype=np.uint8)
+    # Broadcast row and column coordinates for complex patterns
+    x = np.arange(width, dtype=np.float64)
+    y = np.arange(height, dtype=np.float64)[:, None]
+    
+    # Complex mathematical pattern
+    r = 128 + 127 * np.sin(x * 0.01) * np.cos(y * 0.01)
+    g = 128 + 127 * np.sin((x + y) * 0.005)
+    b = 128 + 127 * np.cos(x * 0.008) * np.sin(y * 0.008)
     
-    for y in range(height):
-        for x in range(width):
-            # Complex mathematical pattern
-            r = int(128 + 127 * np.sin(x * 0.01) * np.cos(y * 0.01))
-            g = int(128 + 127 * np.sin((x + y) * 0.005))
-            b = int(128 + 127 * np.cos(x * 0.008) * np.sin(y * 0.008))
-            
-            array[y, x] = [r, g, b]
+    array = np.stack(np.broadcast_arrays(r, g, b), axis=-1).astype(np.uint8)
     
     img = Image.fromarray(array)
     img.save(os.path.join(output_dir, filename))
 
+def _fill_rect(array, box, color):
+    """Fill an inclusive [x1, y1, x2, y2] box like ImageDraw.rectangle."""
+    x1, y1, x2, y2 = box
+    array[y1:y2 + 1, x1:x2 + 1] = ImageColor.getrgb(color) if isinstance(color, str) else color
+
 def create_screenshot_like(output_dir, filename, size):
     """Create a screenshot-like image."""
     width, height = size
-    img = Image.new('RGB', size, color='#2c3e50')
-    draw = ImageDraw.Draw(img)
+    array = np.empty((height, width, 3), dtype=np.uint8)
+    array[...] = ImageColor.getrgb('#2c3e50')
     
     # Window-like interface
     # Title bar
-    draw.rectangle([50, 50, width-50, 100], fill='#34495e')
-    draw.rectangle([50, 100, width-50, height-50], fill='white')
+    _fill_rect(array, [50, 50, width-50, 100], '#34495e')
+    _fill_rect(array, [50, 100, width-50, height-50], 'white')
     
     # Sidebar
-    draw.rectangle([70, 120, 250, height-70], fill='#ecf0f1')
+    _fill_rect(array, [70, 120, 250, height-70], '#ecf0f1')
     
-    # Content area with text-like rectangles
-    for i in range(20):
-        x1 = 270 + random.randint(0, 50)
-        y1 = 140 + i * 25 + random.randint(0, 10)
-        x2 = x1 + random.randint(200, 400)
-        y2 = y1 + 15
-        gray = random.randint(100, 200)
-        draw.rectangle([x1, y1, x2, y2], fill=(gray, gray, gray))
+    # Content area with text-like rectangles (all random draws in one batch)
+    rows = np.arange(20)
+    x1s = 270 + np.random.randint(0, 51, size=20)
+    y1s = 140 + rows * 25 + np.random.randint(0, 11, size=20)
+    x2s = x1s + np.random.randint(200, 401, size=20)
+    grays = np.random.randint(100, 201, size=20)
+    for x1, y1, x2, gray in zip(x1s, y1s, x2s, grays):
+        _fill_rect(array, [x1, y1, x2, y1 + 15], (gray, gray, gray))
     
     # Buttons
     button_colors = ['#3498db', '#e74c3c', '#2ecc71']
     for i, color in enumerate(button_colors):
         x = 270 + i * 120
         y = height - 100
-        draw.rectangle([x, y, x + 100, y + 40], fill=color)
+        _fill_rect(array, [x, y, x + 100, y + 40], color)
     
+    img = Image.fromarray(array, 'RGB')
     img.save(os.path.join(output_dir, filename))
 
 def create_large_image(output_dir, filename, size):
     """Create a large, high-quality image."""
     width, height = size
-    img = Image.new('RGB', size)
-    draw = ImageDraw.Draw(img)
+    half = height // 2
+    array = np.empty((height, width, 3), dtype=np.uint8)
     
     # Create a landscape-like image
     # Sky gradient
-    for y in range(height // 2):
-        blue = int(135 + (255 - 135) * (1 - y / (height // 2)))
-        draw.line([(0, y), (width, y)], fill=(100, 150, blue))
+    sky_rows = np.arange(half)
+    array[:half, :, 0] = 100
+    array[:half, :, 1] = 150
+    array[:half, :, 2] = (135 + (255 - 135) * (1 - sky_rows / half)).astype(np.uint8)[:, None]
     
     # Ground
-    for y in range(height // 2, height):
-        green = int(50 + 100 * ((y - height // 2) / (height // 2)))
-        draw.line([(0, y), (width, y)], fill=(green, 120, 50))
+    ground_rows = np.arange(half, height)
+    array[half:, :, 0] = (50 + 100 * ((ground_rows - half) / half)).astype(np.uint8)[:, None]
+    array[half:, :, 1] = 120
+    array[half:, :, 2] = 50
+    
+    img = Image.fromarray(array, 'RGB')
+    draw = ImageDraw.Draw(img)
     
     # Add some "mountains"
     mountain_points = []
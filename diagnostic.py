@@ -6,13 +6,91 @@ Diagnose and repair problematic image files.
 
 import os
 import sys
+import mmap
+import struct
 from pathlib import Path
 from PIL import Image, ImageFile
 import argparse
-from image_compressor import ImageCompressor, format_size
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from itertools import repeat
+from image_compressor import ImageCompressor, _scan_files, format_size
+
+# File extensions that get the JPEG-specific checks
+_JPEG_EXTS = frozenset({'.jpg', '.jpeg', '.jpe', '.jfif'})
+
+# Markers that carry no length field: TEM, RST0-RST7, SOI
+_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xD8), 0xD8])
+_EOI, _SOS = 0xD9, 0xDA
+
+
+def _scan_jpeg_markers(data) -> tuple:
+    """Walk the JPEG marker structure of a bytes-like object (e.g. an mmap).
+    
+    Returns (last_valid_offset, first_bad_marker_offset, truncated,
+    scan_start). On a clean file last_valid_offset is the offset just past
+    EOI. scan_start is set when the file ends inside entropy-coded scan data
+    that starts there (no marker, let alone EOI, after it); how much of that
+    data is intact can't be told from the markers.
+    """
+    size = len(data)
+    offset = last_valid = 2  # just past SOI
+    while offset + 1 < size:
+        if data[offset] != 0xFF:
+            return last_valid, offset, False, None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before the real marker
+            offset += 1
+            continue
+        if marker == _EOI:
+            return offset + 2, None, False, None
+        if marker in _STANDALONE_MARKERS:
+            offset += 2
+            last_valid = offset
+            continue
+        if offset + 4 > size:
+            return last_valid, None, True, None
+        length, = struct.unpack_from('>H', data, offset + 2)
+        if length < 2:
+            return last_valid, offset, False, None
+        segment_end = offset + 2 + length
+        if segment_end > size:
+            return last_valid, None, True, None
+        
+        if marker == _SOS:
+            # Entropy-coded data runs until the next FF xx with xx not 0x00,
+            # not a restart marker and not a fill byte
+            pos = segment_end
+            while True:
+                pos = data.find(b'\xff', pos)
+                if pos == -1 or pos + 1 >= size:
+                    return last_valid, None, True, segment_end
+                following = data[pos + 1]
+                if following == 0xFF:
+                    pos += 1
+                elif following == 0x00 or 0xD0 <= following <= 0xD7:
+                    pos += 2
+                else:
+                    break
+            segment_end = pos
+        
+        offset = last_valid = segment_end
+    return last_valid, None, True, None
+
+
+@contextmanager
+def _truncated_loading(enabled: bool):
+    """Set ImageFile.LOAD_TRUNCATED_IMAGES for a block, then restore it."""
+    original_setting = ImageFile.LOAD_TRUNCATED_IMAGES
+    ImageFile.LOAD_TRUNCATED_IMAGES = enabled
+    try:
+        yield
+    finally:
+        ImageFile.LOAD_TRUNCATED_IMAGES = original_setting
 
-# Enable loading of truncated images
-ImageFile.LOAD_TRUNCATED_IMAGES = True
 
 class ImageDiagnostic:
     """Diagnostic tool for problematic image files."""
@@ -20,116 +98,215 @@ class ImageDiagnostic:
     def __init__(self):
         self.compressor = ImageCompressor()
     
-    def diagnose_file(self, file_path: str, verbose: bool = True) -> dict:
-        """Comprehensive diagnostic of an image file."""
-        print(f"🔍 Diagnosing: {file_path}")
-        print("=" * 50)
+    def diagnose_file(self, file_path: str, verbose: bool = True, emit: bool = True) -> dict:
+        """Comprehensive diagnostic of an image file.
         
+        Builds a report dict and returns it; with ``emit`` the pretty
+        report is written to stdout in one call.
+        """
+        report = {
+            'file': file_path,
+            'status': None,
+            'is_valid': False,
+            'file_size': None,
+            'extension': None,
+            'validation': None,
+            'read_methods': [],
+            'jpeg': None,
+        }
+        self._run_diagnosis(file_path, verbose, report)
+        if emit:
+            sys.stdout.write(self._format_report(report))
+        return report
+    
+    def _run_diagnosis(self, file_path: str, verbose: bool, report: dict):
+        """Fill in the diagnostic report for one file."""
         # Basic file checks
         if not os.path.exists(file_path):
-            print("❌ File does not exist!")
-            return {'status': 'file_not_found'}
+            report['status'] = 'file_not_found'
+            return
         
         file_size = os.path.getsize(file_path)
-        print(f"📁 File size: {format_size(file_size)}")
+        report['file_size'] = file_size
         
         if file_size == 0:
-            print("❌ File is empty (0 bytes)")
-            return {'status': 'empty_file'}
+            report['status'] = 'empty_file'
+            return
         
         # Check file extension
         ext = Path(file_path).suffix.lower()
-        print(f"📎 Extension: {ext}")
-        
-        # Use our enhanced validation
-        validation = self.compressor.validate_image_file(file_path)
+        report['extension'] = ext
         
-        print(f"\n📊 Validation Results:")
-        print(f"   Valid: {'✅ Yes' if validation['is_valid'] else '❌ No'}")
-        print(f"   Readable: {'✅ Yes' if validation['is_readable'] else '❌ No'}")
-        print(f"   Format detected: {validation['format_detected'] or 'Unknown'}")
-        
-        if validation['error_message']:
-            print(f"   Error: {validation['error_message']}")
-            
-        if validation['suggestions']:
-            print(f"\n💡 Suggestions:")
-            for i, suggestion in enumerate(validation['suggestions'], 1):
-                print(f"   {i}. {suggestion}")
+        # Use our enhanced validation; strict, so truncation shows up here
+        with _truncated_loading(False):
+            validation = self.compressor.validate_image_file(file_path)
+        report['validation'] = validation
+        report['is_valid'] = validation['is_valid']
+        report['status'] = 'valid' if validation['is_valid'] else 'invalid'
         
         # Try different approaches to read the file
-        print(f"\n🔧 Attempting different read methods:")
+        methods = report['read_methods']
         
-        # Method 1: Standard PIL
-        try:
-            with Image.open(file_path) as img:
-                img.load()
-                print("   ✅ Standard PIL: Success")
-                print(f"      Format: {img.format}, Mode: {img.mode}, Size: {img.size}")
-        except Exception as e:
-            print(f"   ❌ Standard PIL: {e}")
+        # Method 1: Standard PIL - validate_image_file already decoded the
+        # file and reports the header fields, so no second open is needed
+        if validation['is_readable']:
+            header = {'format': validation['format_detected'],
+                      'mode': validation['mode'], 'size': validation['size']}
+            methods.append({'method': 'Standard PIL', 'result': 'success', **header})
+        else:
+            methods.append({'method': 'Standard PIL', 'result': 'failed',
+                            'message': validation['error_message']})
+            
+            # Only a failed load is worth a header-only open
+            header = None
+            try:
+                with Image.open(file_path) as img:
+                    header = {'format': img.format, 'mode': img.mode, 'size': img.size}
+            except Exception as e:
+                header_error = str(e)
         
-        # Method 2: With truncated images enabled
-        try:
-            ImageFile.LOAD_TRUNCATED_IMAGES = True
-            with Image.open(file_path) as img:
-                img.load()
-                print("   ✅ Truncated loading: Success")
-                print(f"      Format: {img.format}, Mode: {img.mode}, Size: {img.size}")
-        except Exception as e:
-            print(f"   ❌ Truncated loading: {e}")
-        finally:
-            ImageFile.LOAD_TRUNCATED_IMAGES = False
+        # Method 2: With truncated images enabled - only worth a decode in
+        # verbose mode after a failed load
+        if validation['is_readable']:
+            methods.append({'method': 'Truncated loading', 'result': 'skipped',
+                            'message': 'standard load succeeded'})
+        elif not verbose:
+            methods.append({'method': 'Truncated loading', 'result': 'skipped',
+                            'message': 'use --verbose to try'})
+        else:
+            try:
+                with _truncated_loading(True), Image.open(file_path) as img:
+                    img.load()
+                    methods.append({'method': 'Truncated loading', 'result': 'success',
+                                    'format': img.format, 'mode': img.mode, 'size': img.size})
+            except Exception as e:
+                methods.append({'method': 'Truncated loading', 'result': 'failed',
+                                'message': str(e)})
         
-        # Method 3: Try to verify without loading
-        try:
-            with Image.open(file_path) as img:
-                print("   ✅ Open without load: Success")
-                print(f"      Format: {img.format}, Mode: {img.mode}")
-        except Exception as e:
-            print(f"   ❌ Open without load: {e}")
+        # Method 3: Open without load
+        if header:
+            methods.append({'method': 'Open without load', 'result': 'success',
+                            'format': header['format'], 'mode': header['mode']})
+        else:
+            methods.append({'method': 'Open without load', 'result': 'failed',
+                            'message': header_error})
         
         # Check if it's a JPEG-specific issue
-        if ext in ['.jpg', '.jpeg']:
-            self._diagnose_jpeg_specific(file_path)
-        
-        return validation
+        if ext in _JPEG_EXTS:
+            jpeg = self._diagnose_jpeg_specific(file_path)
+            report['jpeg'] = jpeg
+            # Broken marker structure makes the file invalid even when
+            # Pillow managed to decode it
+            if jpeg['truncated'] or jpeg['bad_marker'] is not None:
+                report['is_valid'] = False
+                report['status'] = 'invalid'
     
-    def _diagnose_jpeg_specific(self, file_path: str):
+    def _diagnose_jpeg_specific(self, file_path: str) -> dict:
         """JPEG-specific diagnostics."""
-        print(f"\n📸 JPEG-Specific Diagnostics:")
+        result = {'signature_valid': None, 'header': None, 'file_size': None,
+                  'end_offset': None, 'bad_marker': None, 'truncated': None,
+                  'unterminated_scan': None, 'error': None}
         
         # Check for common JPEG issues
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(10)
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header = mm[:10]
+                result['header'] = header.hex()
                 
                 # Check JPEG signature
-                if header[:3] == b'\xff\xd8\xff':
-                    print("   ✅ Valid JPEG signature")
-                else:
-                    print("   ❌ Invalid JPEG signature")
-                    print(f"      Header: {header.hex()}")
+                result['signature_valid'] = header[:3] == b'\xff\xd8\xff'
+                if not result['signature_valid']:
+                    return result
                 
-                # Read the end of file
-                f.seek(-10, 2)  # Go to 10 bytes before end
-                tail = f.read()
+                # Walk the marker segments to find where the data stops
+                # being valid, not just whether the last bytes are EOI
+                result['file_size'] = len(mm)
+                (result['end_offset'], result['bad_marker'], result['truncated'],
+                 result['unterminated_scan']) = _scan_jpeg_markers(mm)
                 
-                if tail.endswith(b'\xff\xd9'):
-                    print("   ✅ Valid JPEG end marker")
-                else:
-                    print("   ⚠️  Missing or invalid JPEG end marker")
-                    print("      File might be truncated")
-                    
         except Exception as e:
-            print(f"   ❌ Error reading file structure: {e}")
+            result['error'] = str(e)
+        return result
+    
+    def _format_report(self, report: dict) -> str:
+        """Render a diagnostic report as the human-readable console text."""
+        lines = [f"🔍 Diagnosing: {report['file']}", "=" * 50]
+        
+        if report['status'] == 'file_not_found':
+            lines.append("❌ File does not exist!")
+            return "\n".join(lines) + "\n"
+        
+        lines.append(f"📁 File size: {format_size(report['file_size'])}")
+        if report['status'] == 'empty_file':
+            lines.append("❌ File is empty (0 bytes)")
+            return "\n".join(lines) + "\n"
+        
+        lines.append(f"📎 Extension: {report['extension']}")
+        
+        validation = report['validation']
+        lines.append(f"\n📊 Validation Results:")
+        lines.append(f"   Valid: {'✅ Yes' if report['is_valid'] else '❌ No'}")
+        lines.append(f"   Readable: {'✅ Yes' if validation['is_readable'] else '❌ No'}")
+        lines.append(f"   Format detected: {validation['format_detected'] or 'Unknown'}")
+        
+        if validation['error_message']:
+            lines.append(f"   Error: {validation['error_message']}")
+            
+        if validation['suggestions']:
+            lines.append(f"\n💡 Suggestions:")
+            for i, suggestion in enumerate(validation['suggestions'], 1):
+                lines.append(f"   {i}. {suggestion}")
+        
+        lines.append(f"\n🔧 Attempting different read methods:")
+        for entry in report['read_methods']:
+            if entry['result'] == 'success':
+                lines.append(f"   ✅ {entry['method']}: Success")
+                details = f"      Format: {entry['format']}, Mode: {entry['mode']}"
+                if 'size' in entry:
+                    details += f", Size: {entry['size']}"
+                lines.append(details)
+            elif entry['result'] == 'skipped':
+                lines.append(f"   ⏭️  {entry['method']}: Skipped ({entry['message']})")
+            else:
+                lines.append(f"   ❌ {entry['method']}: {entry['message']}")
+        
+        jpeg = report['jpeg']
+        if jpeg is not None:
+            lines.append(f"\n📸 JPEG-Specific Diagnostics:")
+            if jpeg['signature_valid'] is False:
+                lines.append("   ❌ Invalid JPEG signature")
+                lines.append(f"      Header: {jpeg['header']}")
+            elif jpeg['signature_valid']:
+                lines.append("   ✅ Valid JPEG signature")
+            
+            if jpeg['error']:
+                lines.append(f"   ❌ Error reading file structure: {jpeg['error']}")
+            elif jpeg['signature_valid']:
+                end, size = jpeg['end_offset'], jpeg['file_size']
+                if jpeg['bad_marker'] is not None:
+                    lines.append(f"   ❌ Corrupt marker structure at offset {jpeg['bad_marker']}")
+                    lines.append(f"      Data is valid up to offset {end} of {size}")
+                elif jpeg['unterminated_scan'] is not None:
+                    lines.append("   ⚠️  Missing JPEG end marker")
+                    lines.append(f"      Scan data starting at offset {jpeg['unterminated_scan']} runs to the end "
+                                 f"of the file ({size}) without an end marker; file might be truncated")
+                elif jpeg['truncated']:
+                    lines.append("   ⚠️  Missing or invalid JPEG end marker")
+                    lines.append(f"      File might be truncated (data is valid up to offset {end} of {size})")
+                elif end < size:
+                    lines.append("   ⚠️  Extraneous data after JPEG end marker")
+                    lines.append(f"      {size - end} byte(s) after offset {end - 2}")
+                else:
+                    lines.append("   ✅ Valid JPEG end marker")
+        
+        return "\n".join(lines) + "\n"
     
     def attempt_repair(self, file_path: str, output_path: str = None) -> bool:
         """Attempt to repair a corrupted image file."""
         if output_path is None:
-            name = Path(file_path).stem
-            ext = Path(file_path).suffix
-            output_path = str(Path(file_path).parent / f"{name}_repaired{ext}")
+            path = Path(file_path)
+            output_path = str(path.with_name(f"{path.stem}_repaired{path.suffix}"))
         
         print(f"\n🔧 Attempting repair...")
         print(f"   Input: {file_path}")
@@ -141,65 +318,116 @@ class ImageDiagnostic:
             ("Strip and resave", self._repair_strip_resave),
         ]
         
-        for method_name, method_func in repair_methods:
-            print(f"\n   Trying: {method_name}")
-            try:
-                if method_func(file_path, output_path):
-                    print(f"   ✅ Success with {method_name}")
-                    
-                    # Verify the repaired file
-                    validation = self.compressor.validate_image_file(output_path)
-                    if validation['is_valid']:
-                        print(f"   ✅ Repaired file is valid")
-                        return True
-                    else:
-                        print(f"   ⚠️  Repaired file still has issues")
-                        
-            except Exception as e:
-                print(f"   ❌ {method_name} failed: {e}")
+        # Decode once (tolerating truncation) and try every save strategy
+        # against the same pixels
+        try:
+            with Image.open(file_path) as img:
+                with _truncated_loading(True):
+                    img.load()
+                
+                for method_name, method_func in repair_methods:
+                    print(f"\n   Trying: {method_name}")
+                    try:
+                        if method_func(img, output_path):
+                            print(f"   ✅ Success with {method_name}")
+                            
+                            # Verify the repaired file
+                            validation = self.compressor.validate_image_file(output_path)
+                            if validation['is_valid']:
+                                print(f"   ✅ Repaired file is valid")
+                                return True
+                            else:
+                                print(f"   ⚠️  Repaired file still has issues")
+                                
+                    except Exception as e:
+                        print(f"   ❌ {method_name} failed: {e}")
+        except Exception as e:
+            print(f"   ❌ Could not decode image: {e}")
         
         print("   ❌ All repair methods failed")
         return False
     
-    def _repair_truncated(self, input_path: str, output_path: str) -> bool:
-        """Repair using truncated image loading."""
-        ImageFile.LOAD_TRUNCATED_IMAGES = True
-        try:
-            with Image.open(input_path) as img:
-                img.load()
-                img.save(output_path, quality=95, optimize=True)
-                return True
-        finally:
-            ImageFile.LOAD_TRUNCATED_IMAGES = False
-    
-    def _repair_force_rgb(self, input_path: str, output_path: str) -> bool:
+    def _repair_truncated(self, img: Image.Image, output_path: str) -> bool:
+        """Repair by resaving the truncated-loaded image as is."""
+        img.save(output_path, quality=95, optimize=True)
+        return True
+    
+    def _repair_force_rgb(self, img: Image.Image, output_path: str) -> bool:
         """Repair by forcing RGB conversion."""
-        ImageFile.LOAD_TRUNCATED_IMAGES = True
-        try:
-            with Image.open(input_path) as img:
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                img.save(output_path, 'JPEG', quality=95, optimize=True)
-                return True
-        finally:
-            ImageFile.LOAD_TRUNCATED_IMAGES = False
-    
-    def _repair_strip_resave(self, input_path: str, output_path: str) -> bool:
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.save(output_path, 'JPEG', quality=95, optimize=True)
+        return True
+    
+    def _repair_strip_resave(self, img: Image.Image, output_path: str) -> bool:
         """Repair by stripping metadata and resaving."""
-        ImageFile.LOAD_TRUNCATED_IMAGES = True
-        try:
-            with Image.open(input_path) as img:
-                # Create new image without metadata
-                new_img = Image.new(img.mode, img.size)
-                new_img.putdata(list(img.getdata()))
-                
-                if new_img.mode != 'RGB':
-                    new_img = new_img.convert('RGB')
-                    
-                new_img.save(output_path, 'JPEG', quality=95, optimize=True)
-                return True
-        finally:
-            ImageFile.LOAD_TRUNCATED_IMAGES = False
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        # Rebuild from the raw pixel buffer so no metadata carries over
+        new_img = Image.frombytes('RGB', img.size, img.tobytes())
+        new_img.save(output_path, 'JPEG', quality=95, optimize=True)
+        return True
+
+def diagnose_one(file_path: str, repair: bool = False, as_json: bool = False):
+    """Diagnose (and optionally repair) one file in a worker process.
+    
+    The report is rendered in the worker so parallel output never
+    interleaves. Returns (file_path, is_valid, repaired, report_text).
+    """
+    diagnostic = ImageDiagnostic()
+    report = diagnostic.diagnose_file(file_path, emit=False)
+    is_valid = report['is_valid']
+    
+    repaired = False
+    repair_output = ''
+    if repair and not is_valid:
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            repaired = diagnostic.attempt_repair(file_path)
+        repair_output = buffer.getvalue()
+    report['repaired'] = repaired
+    
+    if as_json:
+        return file_path, is_valid, repaired, json.dumps(report)
+    return file_path, is_valid, repaired, diagnostic._format_report(report) + repair_output
+
+
+def run_batch(directory: str, repair: bool = False, as_json: bool = False) -> dict:
+    """Diagnose every JPEG under a directory using a process pool."""
+    paths = sorted(_scan_files(directory, tuple(_JPEG_EXTS)))
+    summary = {'total': len(paths), 'valid': 0, 'invalid': [], 'repaired': []}
+    if not paths:
+        if as_json:
+            print(json.dumps({'summary': summary}))
+        else:
+            print(f"❌ No JPEG files found in {directory}")
+        return summary
+    
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (4 * workers))  # About four chunks per worker
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_path, is_valid, repaired, report in executor.map(
+                diagnose_one, paths, repeat(repair), repeat(as_json), chunksize=chunksize):
+            print(report)
+            if is_valid:
+                summary['valid'] += 1
+            else:
+                summary['invalid'].append(file_path)
+            if repaired:
+                summary['repaired'].append(file_path)
+    
+    if as_json:
+        print(json.dumps({'summary': summary}))
+        return summary
+    
+    print("=" * 50)
+    print(f"📊 Batch Summary: {summary['valid']}/{summary['total']} files valid")
+    for file_path in summary['invalid']:
+        status = "repaired" if file_path in summary['repaired'] else "invalid"
+        print(f"   ❌ {file_path} ({status})")
+    return summary
+
 
 def main():
     """Main diagnostic function."""
@@ -211,21 +439,40 @@ Examples:
   python diagnostic.py BOB_5931.jpg                    # Diagnose file
   python diagnostic.py BOB_5931.jpg --repair           # Attempt repair
   python diagnostic.py BOB_5931.jpg --repair --output fixed.jpg
+  python diagnostic.py --batch photos/                 # Diagnose a folder
         """
     )
     
-    parser.add_argument('image_file', help='Image file to diagnose')
+    parser.add_argument('image_file', nargs='?', help='Image file to diagnose')
+    parser.add_argument('--batch', metavar='DIR',
+                       help='Diagnose all JPEG files in a directory in parallel')
     parser.add_argument('--repair', action='store_true', 
                        help='Attempt to repair the image')
     parser.add_argument('--output', help='Output path for repaired image')
     parser.add_argument('--verbose', action='store_true', 
                        help='Verbose output')
+    parser.add_argument('--json', action='store_true',
+                       help='Output the diagnostic report as JSON (one line per file with --batch)')
     
     args = parser.parse_args()
     
+    if args.batch:
+        if args.output:
+            parser.error("--output cannot be used with --batch")
+        run_batch(args.batch, args.repair, args.json)
+        return
+    if not args.image_file:
+        parser.error("an image file or --batch DIR is required")
+    if args.json and args.repair:
+        parser.error("--json cannot be combined with --repair for a single file")
+    
     diagnostic = ImageDiagnostic()
     
     # Run diagnosis
+    if args.json:
+        report = diagnostic.diagnose_file(args.image_file, args.verbose, emit=False)
+        print(json.dumps(report, indent=2))
+        return
     result = diagnostic.diagnose_file(args.image_file, args.verbose)
     
     # Attempt repair if requested
@@ -3,6 +3,7 @@
 Test with minimal output to verify auto-repair works.
 """
 
+import os
 import tempfile
 import subprocess
 import sys
@@ -10,6 +11,8 @@ from pathlib import Path
 from PIL import Image
 import numpy as np
 
+from test_helpers import truncated_copy
+
 def main():
     """Test auto-repair functionality without Unicode issues."""
     print("Testing Auto-Repair Functionality")
@@ -20,17 +23,14 @@ def main():
         
         # Create normal image
         normal_path = temp_path / "normal.jpg"
-        arr = np.random.randint(0, 256, (50, 50, 3), dtype=np.uint8)
+        arr = np.frombuffer(np.random.default_rng().bytes(50 * 50 * 3),
+                            dtype=np.uint8).reshape(50, 50, 3)
         img = Image.fromarray(arr)
         img.save(normal_path, format='JPEG', quality=90)
         
         # Create corrupted image
         corrupted_path = temp_path / "corrupted.jpg"
-        with open(normal_path, 'rb') as src:
-            data = src.read()
-        truncated_data = data[:int(len(data) * 0.7)]
-        with open(corrupted_path, 'wb') as dst:
-            dst.write(truncated_data)
+        truncated_copy(normal_path, corrupted_path, int(os.path.getsize(normal_path) * 0.7))
         
         # Import and test Python API directly
         print("1. Testing Python API auto-repair...")
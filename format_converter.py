@@ -4,14 +4,143 @@ Specialized tool for converting between image formats with optimal settings.
 """
 
 import os
+import mmap
+import secrets
+import shutil
 from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageFilter
+import numpy as np
+import copy
 import logging
-from typing import Dict, List, Optional, Tuple
-from image_compressor import ImageCompressor, format_size
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from image_compressor import ImageCompressor, _open_image, format_size
 
 logger = logging.getLogger(__name__)
 
+# Optional faster JPEG decoder (thin libjpeg-turbo binding, no PIL plugin layer)
+try:
+    import simplejpeg
+    HAS_SIMPLEJPEG = True
+except ImportError:
+    HAS_SIMPLEJPEG = False
+
+# Images with more unique colors than this are treated as photos
+PHOTO_COLOR_THRESHOLD = 10000
+
+# Size of the grayscale probe used for edge detection
+EDGE_PROBE_SIZE = (128, 128)
+
+
+# Write buffer for encoder output; encoders (BMP, LZW TIFF) emit many small
+# chunks, so a large buffer turns them into a few big writes
+SAVE_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+@contextmanager
+def _open_output(path: str):
+    """Open an output file for img.save() with a large write buffer.
+    
+    The data goes to a temporary file beside path that replaces it only once
+    encoding succeeds, so a failed save removes just that temporary file and
+    never whatever was already at path (possibly the source itself).
+    """
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+    # os.open applies the umask as open() does; O_EXCL never clobbers a file
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with open(fd, 'wb', buffering=SAVE_BUFFER_SIZE) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _fast_jpeg_decode(img: Image.Image) -> Image.Image:
+    """Decode a freshly opened JPEG with simplejpeg when it is available.
+    
+    Returns a loaded RGB/L image that keeps the source's format and info
+    (EXIF etc.), or img unchanged for other formats/modes, corrupt data,
+    or when simplejpeg is not installed; Pillow then decodes as usual.
+    """
+    if not HAS_SIMPLEJPEG or img.format != 'JPEG' or img.mode not in ('RGB', 'L'):
+        return img
+    
+    try:
+        # Decode straight from the memory map when _open_image used one
+        if isinstance(img.fp, mmap.mmap):
+            data = img.fp
+        else:
+            img.fp.seek(0)
+            data = img.fp.read()
+        
+        colorspace = 'RGB' if img.mode == 'RGB' else 'GRAY'
+        pixels = simplejpeg.decode_jpeg(data, colorspace=colorspace)
+    except (ValueError, OSError):
+        return img
+    
+    if colorspace == 'GRAY':
+        pixels = pixels[:, :, 0]
+    decoded = Image.fromarray(pixels)
+    decoded.format = img.format
+    decoded.info = dict(img.info)
+    return decoded
+
+
+@dataclass
+class ImageCharacteristics:
+    """Result of ImageFormatConverter.analyze_image_characteristics().
+    
+    Slotted (no per-instance __dict__) because batch runs keep one per
+    converted file.
+    """
+    __slots__ = ('width', 'height', 'mode', 'has_transparency', 'is_grayscale',
+                 'is_palette', 'unique_colors', 'is_simple_graphics',
+                 'is_complex_photo', 'is_simple_graphic', 'has_many_edges',
+                 'file_size')
+    
+    width: int
+    height: int
+    mode: str
+    has_transparency: bool
+    is_grayscale: bool
+    is_palette: bool
+    unique_colors: Optional[int]  # None means more than PHOTO_COLOR_THRESHOLD
+    is_simple_graphics: bool
+    is_complex_photo: bool
+    is_simple_graphic: bool  # few enough colors for lossless WebP to win
+    has_many_edges: bool
+    file_size: int
+
+
+# Analysis results keyed on (path, mtime_ns, size), least recently used first
+_ANALYSIS_CACHE_SIZE = 1024
+_analysis_cache = OrderedDict()
+
+
+def _cached_analysis(key: Tuple[str, int, int],
+                     compute: Callable[[], ImageCharacteristics]) -> ImageCharacteristics:
+    """Return a copy of the cached analysis for key, computing it on a miss."""
+    result = _analysis_cache.get(key)
+    if result is None:
+        result = compute()
+        _analysis_cache[key] = result
+        if len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    else:
+        _analysis_cache.move_to_end(key)
+    return copy.copy(result)
+
+
 class ImageFormatConverter:
     """Advanced image format converter with optimal settings for each format."""
     
@@ -56,66 +185,87 @@ class ImageFormatConverter:
         self.compressor = ImageCompressor()
         self.conversion_results = []
     
-    def analyze_image_characteristics(self, image_path: str) -> Dict:
-        """Analyze image to recommend optimal format."""
+    def analyze_image_characteristics(self, image_path: str) -> Optional[ImageCharacteristics]:
+        """Analyze image to recommend optimal format (None if unreadable)."""
         try:
-            with Image.open(image_path) as img:
-                # Basic properties
-                has_transparency = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
-                is_grayscale = img.mode in ('L', 'LA')
-                is_palette = img.mode == 'P'
-                
-                # Color analysis
-                colors = img.getcolors(maxcolors=256*256*256)
-                unique_colors = len(colors) if colors else None
-                
-                # Complexity analysis (simplified)
-                # Convert to grayscale for analysis
-                gray_img = img.convert('L')
-                edges = self._detect_edges_simple(gray_img)
-                
-                characteristics = {
-                    'width': img.size[0],
-                    'height': img.size[1],
-                    'mode': img.mode,
-                    'has_transparency': has_transparency,
-                    'is_grayscale': is_grayscale,
-                    'is_palette': is_palette,
-                    'unique_colors': unique_colors,
-                    'is_simple_graphics': unique_colors and unique_colors < 256,
-                    'is_complex_photo': unique_colors is None or unique_colors > 10000,
-                    'has_many_edges': edges > 0.1,  # Simplified edge detection
-                    'file_size': os.path.getsize(image_path)
-                }
-                
-                return characteristics
+            # Keyed on mtime/size so an edited file is re-analyzed
+            st = os.stat(image_path)
+            
+            def analyze():
+                with _open_image(image_path, st.st_size) as img:
+                    return self._characterize(_fast_jpeg_decode(img), st.st_size)
+            
+            return _cached_analysis((image_path, st.st_mtime_ns, st.st_size), analyze)
                 
         except Exception as e:
             logger.error(f"Error analyzing {image_path}: {e}")
-            return {}
+            return None
     
-    def _detect_edges_simple(self, gray_img: Image.Image) -> float:
-        """Simple edge detection for image complexity analysis."""
+    def _analyze_from_image(self, img: Image.Image, image_path: str,
+                            st: os.stat_result) -> Optional[ImageCharacteristics]:
+        """Analyze an image the caller already has open, sharing the cache."""
         try:
-            # Resize for faster processing
-            small_img = gray_img.resize((100, 100))
-            pixels = list(small_img.getdata())
-            
-            # Simple gradient calculation
-            edges = 0
-            width, height = small_img.size
-            
-            for y in range(height - 1):
-                for x in range(width - 1):
-                    current = pixels[y * width + x]
-                    right = pixels[y * width + (x + 1)]
-                    down = pixels[(y + 1) * width + x]
-                    
-                    grad = abs(current - right) + abs(current - down)
-                    if grad > 30:  # Threshold for edge
-                        edges += 1
-            
-            return edges / (width * height)
+            return _cached_analysis((image_path, st.st_mtime_ns, st.st_size),
+                                    lambda: self._characterize(img, st.st_size))
+        except Exception as e:
+            logger.error(f"Error analyzing {image_path}: {e}")
+            return None
+    
+    @staticmethod
+    def _characterize(img: Image.Image, file_size: int) -> ImageCharacteristics:
+        """Compute the characteristics of an opened image."""
+        # Basic properties
+        has_transparency = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+        is_grayscale = img.mode in ('L', 'LA')
+        is_palette = img.mode == 'P'
+        
+        # Color analysis. Counting stops past PHOTO_COLOR_THRESHOLD, which
+        # keeps the table small and bails out early on photos; None then
+        # means "more than the threshold"
+        colors = img.getcolors(maxcolors=PHOTO_COLOR_THRESHOLD + 1)
+        unique_colors = len(colors) if colors else None
+        
+        # Complexity analysis (simplified)
+        # Downsample first, then convert the small probe to grayscale. Keep
+        # the aspect ratio like thumbnail() would (squashing biases the edge
+        # density) but without copying the full-size image to shrink in place
+        width, height = img.size
+        scale = min(EDGE_PROBE_SIZE[0] / width, EDGE_PROBE_SIZE[1] / height, 1.0)
+        probe_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        small_gray = img.resize(probe_size, Image.Resampling.BILINEAR,
+                                reducing_gap=2.0).convert('L')
+        edges = ImageFormatConverter._detect_edges_from_small(small_gray)
+        
+        return ImageCharacteristics(
+            width=img.size[0],
+            height=img.size[1],
+            mode=img.mode,
+            has_transparency=has_transparency,
+            is_grayscale=is_grayscale,
+            is_palette=is_palette,
+            unique_colors=unique_colors,
+            is_simple_graphics=unique_colors is not None and unique_colors < 256,
+            is_complex_photo=unique_colors is None or unique_colors > PHOTO_COLOR_THRESHOLD,
+            is_simple_graphic=unique_colors is not None and unique_colors < 64,
+            has_many_edges=edges > 0.1,  # Simplified edge detection
+            file_size=file_size
+        )
+    
+    @staticmethod
+    def _detect_edges_from_small(small_img: Image.Image) -> float:
+        """Simple edge detection on an already downsampled grayscale probe."""
+        try:
+            # Pillow's C edge kernel (SIMD-accelerated under pillow-simd)
+            edges_img = small_img.filter(ImageFilter.FIND_EDGES)
+            # Read-only view over the raw 8-bit buffer, no per-pixel objects.
+            # The kernel leaves the 1-px border unfiltered (source gray
+            # values), so only the interior counts.
+            width, height = edges_img.size
+            pixels = np.frombuffer(edges_img.tobytes(), dtype=np.uint8).reshape(height, width)
+            interior = pixels[1:-1, 1:-1]
+            if interior.size == 0:
+                return 0.0
+            return float((interior > 30).mean())  # Threshold for edge
             
         except Exception:
             return 0.0
@@ -124,13 +274,13 @@ class ImageFormatConverter:
         """Recommend optimal format based on image characteristics and use case."""
         characteristics = self.analyze_image_characteristics(image_path)
         
-        if not characteristics:
+        if characteristics is None:
             return {'recommended_format': 'jpeg', 'reason': 'Default fallback'}
         
         recommendations = []
         
         # Format selection logic
-        if characteristics.get('has_transparency'):
+        if characteristics.has_transparency:
             if target_use == 'web':
                 recommendations.append({
                     'format': 'webp',
@@ -149,7 +299,7 @@ class ImageFormatConverter:
                     'score': 9
                 })
         
-        elif characteristics.get('is_simple_graphics'):
+        elif characteristics.is_simple_graphics:
             recommendations.append({
                 'format': 'png',
                 'reason': 'PNG is optimal for graphics with few colors',
@@ -162,7 +312,7 @@ class ImageFormatConverter:
                     'score': 9
                 })
         
-        elif characteristics.get('is_complex_photo'):
+        elif characteristics.is_complex_photo:
             recommendations.append({
                 'format': 'jpeg',
                 'reason': 'JPEG is optimal for complex photos',
@@ -203,41 +353,80 @@ class ImageFormatConverter:
             return {'recommended_format': 'jpeg', 'reason': 'Default fallback', 'score': 5}
     
     def convert_format(self, input_path: str, target_format: str,
-                      output_path: str = None, quality: str = 'high',
-                      optimize_for_web: bool = False) -> Dict:
-        """Convert image to specified format with optimal settings."""
+                      output_path: str = None, quality: Optional[str] = None,
+                      optimize_for_web: bool = False, max_effort: bool = False,
+                      allow_passthrough: bool = True,
+                      input_stat: Optional[os.stat_result] = None) -> Dict:
+        """Convert image to specified format with optimal settings.
+        
+        ``quality`` defaults to 'high'. ``max_effort`` trades much slower
+        WebP encoding for slightly smaller files (libwebp method 6 instead
+        of the default 4). With ``allow_passthrough``, an image already in
+        the target format is copied byte-for-byte instead of being decoded
+        and re-encoded, unless a quality, web optimization or max effort
+        was asked for.
+        ``input_stat`` lets batch callers pass an os.stat result they
+        already have.
+        """
         try:
             if target_format not in self.FORMAT_CONFIGS:
                 raise ValueError(f"Unsupported target format: {target_format}")
             
             # Set output path if not provided
             if output_path is None:
-                input_file = Path(input_path)
-                output_path = str(input_file.parent / f"{input_file.stem}.{target_format}")
+                output_path = self._default_output_path(input_path, target_format)
             
             # Get original file info
-            original_size = os.path.getsize(input_path)
-            characteristics = self.analyze_image_characteristics(input_path)
+            st = input_stat if input_stat is not None else os.stat(input_path)
+            original_size = st.st_size
             
-            with Image.open(input_path) as img:
+            with _open_image(input_path, original_size) as img:
                 original_format = img.format
-                converted_img = img.copy()
+                passthrough = (allow_passthrough and quality is None and
+                               not optimize_for_web and not max_effort and
+                               original_format is not None and
+                               original_format.lower() == target_format and
+                               os.path.abspath(input_path) != os.path.abspath(output_path))
+                if quality is None:
+                    quality = 'high'
+                
+                # Analyze the image we already have open instead of decoding
+                # twice; a pass-through copy never decodes at all
+                if passthrough:
+                    characteristics = None
+                else:
+                    img = _fast_jpeg_decode(img)
+                    characteristics = self._analyze_from_image(img, input_path, st)
+                    # An analysis-cache hit leaves img lazy; decode it now so
+                    # writing the output (possibly over the input, or over
+                    # the file behind its mmap) can't cut the source short
+                    img.load()
                 
-                # Format-specific conversion
-                if target_format == 'jpeg':
-                    result = self._convert_to_jpeg(converted_img, output_path, quality, optimize_for_web)
+                # Format-specific conversion. The helpers never modify img in
+                # place (conversions return new images), so no defensive copy
+                if passthrough:
+                    shutil.copyfile(input_path, output_path)
+                    result = {
+                        'conversion_settings': {'passthrough': True},
+                        'notes': 'Already in target format, copied without re-encoding'
+                    }
+                    
+                elif target_format == 'jpeg':
+                    result = self._convert_to_jpeg(img, output_path, quality, optimize_for_web)
                     
                 elif target_format == 'png':
-                    result = self._convert_to_png(converted_img, output_path, quality, optimize_for_web)
+                    result = self._convert_to_png(img, output_path, quality, optimize_for_web)
                     
                 elif target_format == 'webp':
-                    result = self._convert_to_webp(converted_img, output_path, quality, optimize_for_web)
+                    result = self._convert_to_webp(img, output_path, quality,
+                                                   optimize_for_web, max_effort,
+                                                   characteristics)
                     
                 elif target_format == 'tiff':
-                    result = self._convert_to_tiff(converted_img, output_path, quality)
+                    result = self._convert_to_tiff(img, output_path, quality)
                     
                 elif target_format == 'bmp':
-                    result = self._convert_to_bmp(converted_img, output_path)
+                    result = self._convert_to_bmp(img, output_path)
                 
                 else:
                     raise ValueError(f"Conversion to {target_format} not implemented")
@@ -261,7 +450,10 @@ class ImageFormatConverter:
             })
             
             self.conversion_results.append(result)
-            logger.info(f"Converted {input_path} to {target_format}")
+            if passthrough:
+                logger.info(f"Copied {input_path} as-is (already {target_format})")
+            else:
+                logger.info(f"Converted {input_path} to {target_format}")
             
             return result
             
@@ -274,28 +466,44 @@ class ImageFormatConverter:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _default_output_path(input_path: str, target_format: str) -> str:
+        """Output path used when none is given: same folder, new extension."""
+        input_file = Path(input_path)
+        return str(input_file.parent / f"{input_file.stem}.{target_format}")
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _quality_setting(fmt: str, quality: str) -> int:
+        """Look up the encoder setting for a quality name (default: medium)."""
+        quality_map = ImageFormatConverter.FORMAT_CONFIGS[fmt]['quality_ranges']
+        return quality_map.get(quality, quality_map['medium'])
+    
     def _convert_to_jpeg(self, img: Image.Image, output_path: str,
                         quality: str, optimize_for_web: bool) -> Dict:
         """Convert to JPEG with optimal settings."""
+        # Grab EXIF from the source before any conversion; compositing onto
+        # a new background would otherwise drop it
+        exif = img.info.get('exif')
+        
         # Convert to RGB if necessary
         if img.mode in ('RGBA', 'LA', 'P'):
             if img.mode == 'P' and 'transparency' in img.info:
                 img = img.convert('RGBA')
             
-            if img.mode in ('RGBA', 'LA'):
+            if img.mode in ('RGBA', 'LA') and img.getextrema()[-1][0] == 255:
+                # Fully opaque alpha: just drop the channel, nothing to blend
+                img = img.convert('RGB')
+            elif img.mode in ('RGBA', 'LA'):
                 # Create white background
                 background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    background.paste(img, mask=img.split()[-1])
-                else:
-                    background.paste(img, mask=img.split()[1])
+                background.paste(img, mask=img.getchannel('A'))
                 img = background
             else:
                 img = img.convert('RGB')
         
         # Quality settings
-        quality_map = self.FORMAT_CONFIGS['jpeg']['quality_ranges']
-        jpeg_quality = quality_map.get(quality, quality_map['medium'])
+        jpeg_quality = self._quality_setting('jpeg', quality)
         
         save_kwargs = {
             'format': 'JPEG',
@@ -305,10 +513,11 @@ class ImageFormatConverter:
         }
         
         # Preserve EXIF if available
-        if hasattr(img, 'info') and 'exif' in img.info:
-            save_kwargs['exif'] = img.info['exif']
+        if exif:
+            save_kwargs['exif'] = exif
         
-        img.save(output_path, **save_kwargs)
+        with _open_output(output_path) as f:
+            img.save(f, **save_kwargs)
         
         return {
             'conversion_settings': save_kwargs,
@@ -319,8 +528,7 @@ class ImageFormatConverter:
                        quality: str, optimize_for_web: bool) -> Dict:
         """Convert to PNG with optimal settings."""
         # PNG compression level (0-9)
-        quality_map = self.FORMAT_CONFIGS['png']['quality_ranges']
-        compress_level = quality_map.get(quality, quality_map['medium'])
+        compress_level = self._quality_setting('png', quality)
         
         save_kwargs = {
             'format': 'PNG',
@@ -335,11 +543,17 @@ class ImageFormatConverter:
             # Check if we can use palette mode
             colors = img.getcolors(maxcolors=256)
             if colors and len(colors) <= 256:
-                # Convert to palette mode for smaller file size
-                img = img.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+                # Convert to palette mode for smaller file size. libimagequant
+                # is faster and smaller when Pillow has it; otherwise fast
+                # octree, since median cut cannot quantize RGBA at all
+                try:
+                    img = img.quantize(colors=256, method=Image.Quantize.LIBIMAGEQUANT)
+                except ValueError:
+                    img = img.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
                 notes.append("Converted to palette mode for smaller size")
         
-        img.save(output_path, **save_kwargs)
+        with _open_output(output_path) as f:
+            img.save(f, **save_kwargs)
         
         return {
             'conversion_settings': save_kwargs,
@@ -347,27 +561,34 @@ class ImageFormatConverter:
         }
     
     def _convert_to_webp(self, img: Image.Image, output_path: str,
-                        quality: str, optimize_for_web: bool) -> Dict:
+                        quality: str, optimize_for_web: bool,
+                        max_effort: bool = False,
+                        characteristics: Optional[ImageCharacteristics] = None) -> Dict:
         """Convert to WebP with optimal settings."""
-        quality_map = self.FORMAT_CONFIGS['webp']['quality_ranges']
-        webp_quality = quality_map.get(quality, quality_map['medium'])
+        webp_quality = self._quality_setting('webp', quality)
         
         # Use lossless for images with transparency or simple graphics
+        # (reuse the analysis when the caller has it)
+        if characteristics is not None:
+            is_simple_graphic = characteristics.is_simple_graphic
+        else:
+            is_simple_graphic = self._is_simple_graphic(img)
         use_lossless = (img.mode in ('RGBA', 'LA') or 
                        'transparency' in img.info or 
-                       self._is_simple_graphic(img))
+                       is_simple_graphic)
         
+        # method 4 is libwebp's own default; 6 is several times slower for a
+        # marginal size gain. In lossless mode quality sets encoder effort,
+        # so the preset quality applies there too unless max effort is asked
         save_kwargs = {
             'format': 'WEBP',
-            'quality': 100 if use_lossless else webp_quality,
-            'method': 6,  # Maximum compression effort
+            'quality': 100 if use_lossless and max_effort else webp_quality,
+            'method': 6 if max_effort else 4,
             'lossless': use_lossless
         }
         
-        if optimize_for_web:
-            save_kwargs['method'] = 4  # Faster compression for web
-        
-        img.save(output_path, **save_kwargs)
+        with _open_output(output_path) as f:
+            img.save(f, **save_kwargs)
         
         return {
             'conversion_settings': save_kwargs,
@@ -381,7 +602,8 @@ class ImageFormatConverter:
             'compression': 'lzw'  # Lossless compression
         }
         
-        img.save(output_path, **save_kwargs)
+        with _open_output(output_path) as f:
+            img.save(f, **save_kwargs)
         
         return {
             'conversion_settings': save_kwargs,
@@ -395,7 +617,8 @@ class ImageFormatConverter:
             img = img.convert('RGB')
         
         save_kwargs = {'format': 'BMP'}
-        img.save(output_path, **save_kwargs)
+        with _open_output(output_path) as f:
+            img.save(f, **save_kwargs)
         
         return {
             'conversion_settings': save_kwargs,
@@ -416,59 +639,135 @@ class ImageFormatConverter:
             return False
     
     def batch_convert(self, input_paths: List[str], target_format: str,
-                     output_dir: str = None, quality: str = 'high',
+                     output_dir: str = None, quality: Optional[str] = None,
                      auto_recommend: bool = False,
-                     optimize_for_web: bool = False) -> Dict:
-        """Convert multiple images to specified format."""
-        results = []
-        
+                     optimize_for_web: bool = False,
+                     workers: Optional[int] = None,
+                     max_effort: bool = False,
+                     skip_existing: bool = False) -> Dict:
+        """Convert multiple images to specified format.
+        
+        Files are converted in a process pool of ``workers`` processes
+        (default: one per CPU); ``workers=1`` converts them in-process.
+        With ``skip_existing``, files whose output already exists are
+        reported as skipped instead of being converted again.
+        """
         # Create output directory
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
         
+        # One stat per input both filters out missing files and gives
+        # convert_format the size without stat'ing again
+        tasks = []
         for input_path in input_paths:
-            if not os.path.exists(input_path):
+            try:
+                st = os.stat(input_path)
+            except OSError:
                 continue
-            
-            # Auto-recommend format if requested
-            if auto_recommend:
-                recommendation = self.recommend_format(input_path)
-                actual_format = recommendation.get('recommended_format', target_format)
-            else:
-                actual_format = target_format
-            
-            # Determine output path
-            if output_dir:
-                filename = Path(input_path).stem
-                output_path = os.path.join(output_dir, f"{filename}.{actual_format}")
+            tasks.append((input_path, target_format, output_dir, quality,
+                          auto_recommend, optimize_for_web, max_effort,
+                          st, skip_existing))
+        
+        # Never more workers than tasks; chunksize below uses the same count
+        workers = min(workers or os.cpu_count() or 1, max(1, len(tasks)))
+        in_process = workers == 1 or len(tasks) <= 1
+        pool = (nullcontext() if in_process else
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker))
+        
+        # Batch statistics are tallied as each result comes back
+        results = []
+        successful = skipped = 0
+        total_original_size = total_converted_size = 0
+        
+        with pool as executor:
+            if in_process:
+                outcomes = (self._convert_one(*task) for task in tasks)
             else:
-                output_path = None
-            
-            # Convert image
-            result = self.convert_format(
-                input_path, actual_format, output_path, quality, optimize_for_web
-            )
-            
-            if auto_recommend and actual_format != target_format:
-                result['auto_recommended'] = True
-                result['recommendation_reason'] = recommendation.get('reason', '')
+                # About four chunks per worker, as in compress_batch
+                chunksize = max(1, len(tasks) // (4 * workers))
+                outcomes = executor.map(_convert_one_worker, tasks, chunksize=chunksize)
             
-            results.append(result)
-        
-        # Calculate batch statistics
-        successful = [r for r in results if r.get('success', False)]
-        total_original_size = sum(r.get('original_size', 0) for r in successful)
-        total_converted_size = sum(r.get('converted_size', 0) for r in successful)
+            for result in outcomes:
+                results.append(result)
+                if result.get('success', False):
+                    successful += 1
+                    total_original_size += result['original_size']
+                    total_converted_size += result['converted_size']
+                    # Workers record into their own converter; mirror that here
+                    if not in_process:
+                        self.conversion_results.append(result)
+                elif result.get('skipped', False):
+                    skipped += 1
         
         return {
             'total_files': len(input_paths),
-            'successful': len(successful),
-            'failed': len(results) - len(successful),
+            'successful': successful,
+            'failed': len(results) - successful - skipped,
+            'skipped': skipped,
             'total_original_size': total_original_size,
             'total_converted_size': total_converted_size,
             'total_size_change': total_converted_size - total_original_size,
             'results': results
         }
+    
+    def _convert_one(self, input_path: str, target_format: str, output_dir: Optional[str],
+                     quality: Optional[str], auto_recommend: bool, optimize_for_web: bool,
+                     max_effort: bool = False, input_stat: Optional[os.stat_result] = None,
+                     skip_existing: bool = False) -> Dict:
+        """Convert a single file as part of a batch."""
+        # Auto-recommend format if requested
+        if auto_recommend:
+            recommendation = self.recommend_format(input_path)
+            actual_format = recommendation.get('recommended_format', target_format)
+        else:
+            actual_format = target_format
+        
+        # Determine output path
+        if output_dir:
+            filename = Path(input_path).stem
+            output_path = os.path.join(output_dir, f"{filename}.{actual_format}")
+        else:
+            output_path = self._default_output_path(input_path, actual_format)
+        
+        if skip_existing and os.path.exists(output_path):
+            return {
+                'success': False,
+                'skipped': True,
+                'input_path': input_path,
+                'output_path': output_path,
+                'error': 'Output file already exists'
+            }
+        
+        # Convert image
+        result = self.convert_format(
+            input_path, actual_format, output_path, quality, optimize_for_web, max_effort,
+            input_stat=input_stat
+        )
+        
+        if auto_recommend and actual_format != target_format:
+            result['auto_recommended'] = True
+            result['recommendation_reason'] = recommendation.get('reason', '')
+        
+        return result
+
+
+# The pool worker's converter, built once by _init_worker
+_worker_converter = None
+
+
+def _init_worker() -> None:
+    """Pool initializer: build this process's ImageFormatConverter once, not per file."""
+    global _worker_converter
+    _worker_converter = ImageFormatConverter()
+
+
+def _convert_one_worker(task: Tuple) -> Dict:
+    """Process-pool entry point for batch_convert (must be module level)."""
+    try:
+        return _worker_converter._convert_one(*task)
+    finally:
+        # The parent mirrors results itself; don't keep them here as well
+        _worker_converter.conversion_results.clear()
 
 if __name__ == "__main__":
     # Example usage
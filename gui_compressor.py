@@ -7,11 +7,74 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 import threading
+import multiprocessing
 import os
-from pathlib import Path
+import json
+import hashlib
+import PIL
 from PIL import Image, ImageTk
 import queue
-from image_compressor import ImageCompressor, format_size
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+from image_compressor import (ImageCompressor, PILLOW_SIMD, _compress_one_worker,
+                              _init_worker as _init_compress_worker, format_size)
+
+# Optional libvips backend for previews: it shrinks while decoding, in
+# constant memory, whatever the source size and format
+try:
+    import pyvips
+    HAS_PYVIPS = True
+except (ImportError, OSError):  # OSError: pyvips installed but libvips missing
+    HAS_PYVIPS = False
+
+# Most progress-queue messages handled per GUI tick
+PROGRESS_DRAIN_LIMIT = 200
+
+# Per-output-directory record of finished files, used to skip unchanged
+# inputs on the next run
+COMPRESS_CACHE_NAME = '.compress_cache.json'
+
+# check_progress_queue interval while work is running / while idle (ms)
+POLL_ACTIVE_MS = 50
+POLL_IDLE_MS = 500
+
+# Rendered previews kept for quick re-selection, least recently used first
+PREVIEW_CACHE_SIZE = 32
+
+# Lines shown in the results panel; older ones are trimmed from the top but
+# kept (up to RESULTS_HISTORY_SIZE) for "Save Log"
+MAX_DISPLAYED_LINES = 5000
+RESULTS_HISTORY_SIZE = 200000
+
+
+def _compress_cache_key(file_path: str, st: os.stat_result, kwargs: Dict) -> str:
+    """Key a compression by input identity (path, mtime, size) and settings."""
+    key = (f"{file_path}|{st.st_mtime_ns}|{st.st_size}|{kwargs['quality_preset']}|"
+           f"{kwargs['target_format']}|{kwargs['preserve_exif']}")
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# Set by stop_compression; shared with pool workers through _init_worker
+_cancel_event = None
+
+
+def _init_worker(cancel_event, auto_repair: bool) -> None:
+    """Pool initializer: image_compressor's, plus the shared cancel event."""
+    global _cancel_event
+    _cancel_event = cancel_event
+    _init_compress_worker(auto_repair)
+
+
+def _compress_one(file_path: str, output_path: str, kwargs: Dict) -> Dict:
+    """Compress a single file in a worker process.
+    
+    Files still queued when the user presses Stop are skipped.
+    """
+    if _cancel_event.is_set():
+        return {'success': False, 'cancelled': True, 'error': 'Cancelled'}
+    return _compress_one_worker(file_path, output_path, kwargs)
+
 
 class ImageCompressorGUI:
     """Advanced GUI for image compression with real-time preview and batch processing."""
@@ -27,6 +90,7 @@ class ImageCompressorGUI:
         
         # Initialize variables
         self.selected_files = []
+        self._selected_set = set()  # Same paths, for O(1) duplicate checks
         self.output_directory = tk.StringVar()
         self.quality_preset = tk.StringVar(value="balanced")
         self.target_format = tk.StringVar(value="same")
@@ -34,15 +98,43 @@ class ImageCompressorGUI:
         self.auto_repair = tk.BooleanVar(value=True)
         self.current_preview_path = None
         
-        # Queue for thread communication
-        self.progress_queue = queue.Queue()
+        # (format, width, height, file_size) per path, read from headers only
+        self._meta_cache = {}
+        
+        # (path, mtime_ns) -> (PhotoImage, info text)
+        self._preview_cache = OrderedDict()
+        
+        # Previews are decoded off the Tk thread; the token identifies the
+        # latest request so results for earlier clicks can be dropped
+        self._preview_executor = ThreadPoolExecutor(max_workers=1)
+        self._preview_token = 0
+        
+        # Every result message of the current run, for "Save Log"
+        self._results_history = deque(maxlen=RESULTS_HISTORY_SIZE)
+        
+        # Set while an auto-scroll of the results is scheduled
+        self._see_pending = False
+        
+        # Set by the Stop button; checked between files by every worker
+        self._cancel_event = multiprocessing.Event()
+        
+        # Queue for thread communication. SimpleQueue suffices (no
+        # task_done/join, no size limit) and has less locking overhead
+        self.progress_queue = queue.SimpleQueue()
+        
+        # Work whose results arrive through progress_queue; the queue is
+        # polled quickly while there is any and slowly otherwise
+        self._running = False
+        self._previews_pending = 0
         
         # Setup GUI
         self.setup_gui()
         self.setup_styles()
+        self.results_text.insert(
+            tk.END, f"Pillow {PIL.__version__}{' (SIMD)' if PILLOW_SIMD else ''}\n")
         
         # Start monitoring progress queue
-        self.root.after(100, self.check_progress_queue)
+        self._poll_job = self.root.after(POLL_ACTIVE_MS, self.check_progress_queue)
     
     def setup_styles(self):
         """Configure custom styles for the GUI."""
@@ -175,6 +267,8 @@ class ImageCompressorGUI:
         preview_frame.rowconfigure(0, weight=1)
         
         self.preview_canvas = tk.Canvas(preview_frame, bg="white", width=300, height=300)
+        # One image item, reused for every preview by swapping its image
+        self._preview_item = self.preview_canvas.create_image(150, 150, anchor=tk.CENTER)
         v_scrollbar = ttk.Scrollbar(preview_frame, orient=tk.VERTICAL, command=self.preview_canvas.yview)
         h_scrollbar = ttk.Scrollbar(preview_frame, orient=tk.HORIZONTAL, command=self.preview_canvas.xview)
         
@@ -229,6 +323,9 @@ class ImageCompressorGUI:
                                     command=self.stop_compression, state=tk.DISABLED)
         self.stop_button.pack(side=tk.LEFT)
         
+        ttk.Button(control_frame, text="Save Log",
+                  command=self.save_log).pack(side=tk.LEFT, padx=(10, 0))
+        
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(control_frame, variable=self.progress_var, maximum=100)
@@ -256,29 +353,27 @@ class ImageCompressorGUI:
         files = filedialog.askopenfilenames(title="Select Images", filetypes=filetypes)
         
         for file in files:
-            if file not in self.selected_files:
+            if file not in self._selected_set:
+                self._selected_set.add(file)
                 self.selected_files.append(file)
         
         self.update_files_list()
+        self.start_metadata_scan()
     
     def select_folder(self):
         """Open dialog to select a folder containing images."""
         folder = filedialog.askdirectory(title="Select Folder Containing Images")
         
         if folder:
-            # Find all image files in the folder
-            for ext in ['.jpg', '.jpeg', '.png', '.webp', '.tiff', '.bmp']:
-                for file_path in Path(folder).rglob(f"*{ext}"):
-                    str_path = str(file_path)
-                    if str_path not in self.selected_files:
-                        self.selected_files.append(str_path)
-                        
-                for file_path in Path(folder).rglob(f"*{ext.upper()}"):
-                    str_path = str(file_path)
-                    if str_path not in self.selected_files:
-                        self.selected_files.append(str_path)
+            # Find all image files in the folder with the same scandir walk
+            # compress_batch uses, matching extensions case-insensitively
+            for file_path in self.compressor._iter_image_files(folder):
+                if file_path not in self._selected_set:
+                    self._selected_set.add(file_path)
+                    self.selected_files.append(file_path)
         
         self.update_files_list()
+        self.start_metadata_scan()
     
     def select_output_directory(self):
         """Open dialog to select output directory."""
@@ -289,6 +384,7 @@ class ImageCompressorGUI:
     def clear_files(self):
         """Clear all selected files."""
         self.selected_files.clear()
+        self._selected_set.clear()
         self.update_files_list()
         self.clear_preview()
     
@@ -297,6 +393,7 @@ class ImageCompressorGUI:
         selection = self.files_listbox.curselection()
         if selection:
             index = selection[0]
+            self._selected_set.discard(self.selected_files[index])
             del self.selected_files[index]
             self.update_files_list()
             if not self.selected_files:
@@ -306,13 +403,30 @@ class ImageCompressorGUI:
         """Update the files listbox."""
         self.files_listbox.delete(0, tk.END)
         
-        for file_path in self.selected_files:
-            filename = Path(file_path).name
-            self.files_listbox.insert(tk.END, filename)
+        # One insert call for all rows; per-row inserts cost a Tcl round
+        # trip (and a redraw) each
+        if self.selected_files:
+            self.files_listbox.insert(tk.END, *map(os.path.basename, self.selected_files))
         
         count = len(self.selected_files)
         self.files_count_label.config(text=f"{count} file{'s' if count != 1 else ''} selected")
     
+    def start_metadata_scan(self):
+        """Read metadata for the selected files in a background thread."""
+        pending = [p for p in self.selected_files if p not in self._meta_cache]
+        if pending:
+            threading.Thread(target=self._scan_metadata, args=(pending,), daemon=True).start()
+    
+    def _scan_metadata(self, paths):
+        """Fill the metadata cache from image headers, without decoding pixels."""
+        for path in paths:
+            try:
+                with Image.open(path) as img:
+                    self._meta_cache[path] = (img.format, img.size[0], img.size[1],
+                                              os.path.getsize(path))
+            except Exception:
+                pass  # Unreadable; show_preview falls back to get_image_info
+    
     def on_file_select(self, event):
         """Handle file selection in the listbox."""
         selection = self.files_listbox.curselection()
@@ -322,41 +436,127 @@ class ImageCompressorGUI:
             self.show_preview(file_path)
     
     def show_preview(self, image_path):
-        """Display image preview with information."""
+        """Display image preview with information.
+        
+        Cached previews are shown at once; anything else is decoded on a
+        background thread and shown by check_progress_queue when ready.
+        """
+        self.current_preview_path = image_path
+        self._preview_token += 1
+        
         try:
-            self.current_preview_path = image_path
-            
-            # Get image info
+            # Keyed on mtime so an edited file is rendered again
+            key = (image_path, os.stat(image_path).st_mtime_ns)
+        except OSError as e:
+            self._show_preview_error(str(e))
+            return
+        
+        cached = self._preview_cache.get(key)
+        if cached is not None:
+            self._preview_cache.move_to_end(key)
+            self._display_preview(*cached)
+        else:
+            self._preview_executor.submit(self._decode_preview, image_path, key,
+                                          self._preview_token)
+            self._previews_pending += 1
+            self._poll_soon()
+    
+    def _decode_preview(self, image_path, key, token):
+        """Render a preview in the background and post it to the Tk thread."""
+        try:
+            img = self._render_preview(image_path)
+            info_text = self._preview_info_text(image_path)
+            self.progress_queue.put(("preview", (token, key, img, info_text)))
+        except Exception as e:
+            self.progress_queue.put(("preview_error", (token, str(e))))
+    
+    def _on_preview_decoded(self, token, key, img, info_text):
+        """Show a preview decoded by _decode_preview, unless it is stale."""
+        if token != self._preview_token:
+            return  # The user has already selected another file
+        
+        try:
+            # PhotoImage must be created on the Tk thread
+            cached = (ImageTk.PhotoImage(img), info_text)
+            self._preview_cache[key] = cached
+            if len(self._preview_cache) > PREVIEW_CACHE_SIZE:
+                self._preview_cache.popitem(last=False)
+            self._display_preview(*cached)
+        except Exception as e:
+            self._show_preview_error(str(e))
+    
+    def _display_preview(self, photo, info_text):
+        """Put a rendered preview and its info text on screen."""
+        self.preview_photo = photo
+        
+        # Update info label
+        if info_text:
+            self.preview_info.config(text=info_text)
+        
+        # Display image
+        self.preview_canvas.itemconfigure(self._preview_item, image=self.preview_photo)
+        self.preview_canvas.coords(self._preview_item, 150, 150)
+        
+        # Update scroll region
+        self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all"))
+    
+    def _show_preview_error(self, error):
+        """Report a preview that could not be loaded."""
+        self.preview_info.config(text=f"Error loading preview: {error}")
+        self.clear_preview()
+    
+    def _preview_info_text(self, image_path):
+        """Format the info label text for an image, or None if unknown."""
+        # Get image info, from the header cache when the scan got there
+        meta = self._meta_cache.get(image_path)
+        if meta is None:
             info = self.compressor.get_image_info(image_path)
-            
-            # Update info label
             if info:
-                info_text = (f"{info['format']} • {info['width']}×{info['height']} • "
-                           f"{format_size(info['file_size'])}")
-                self.preview_info.config(text=info_text)
+                meta = (info['format'], info['width'], info['height'], info['file_size'])
+        
+        if not meta:
+            return None
+        fmt, width, height, file_size = meta
+        return f"{fmt} • {width}×{height} • {format_size(file_size)}"
+    
+    def _render_preview(self, image_path):
+        """Decode an image scaled down to fit the 300x300 preview."""
+        if HAS_PYVIPS:
+            try:
+                img = self._render_preview_vips(image_path)
+                if img is not None:
+                    return img
+            except pyvips.Error:
+                pass  # Let Pillow try (and report the error if it fails too)
+        
+        with Image.open(image_path) as img:
+            # Calculate display size (max 300x300)
+            display_size = self.calculate_display_size(img.size, (300, 300))
             
-            # Load and display image
-            with Image.open(image_path) as img:
-                # Calculate display size (max 300x300)
-                display_size = self.calculate_display_size(img.size, (300, 300))
-                
-                # Resize image for display
-                display_img = img.copy()
-                display_img.thumbnail(display_size, Image.Resampling.LANCZOS)
-                
-                # Convert to PhotoImage
-                self.preview_photo = ImageTk.PhotoImage(display_img)
-                
-                # Clear canvas and display image
-                self.preview_canvas.delete("all")
-                self.preview_canvas.create_image(150, 150, image=self.preview_photo, anchor=tk.CENTER)
-                
-                # Update scroll region
-                self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all"))
-                
-        except Exception as e:
-            self.preview_info.config(text=f"Error loading preview: {str(e)}")
-            self.clear_preview()
+            # Let libjpeg scale down by 1/2-1/8 while decoding instead
+            # of decoding every pixel only to throw most away
+            if img.format == "JPEG":
+                img.draft("RGB", display_size)
+            
+            # Resize image for display. thumbnail() works in place on
+            # the not-yet-loaded image; copying first would force a
+            # full-size decode. reducing_gap box-reduces to ~2x the target
+            # first so LANCZOS only runs over a small image
+            img.thumbnail(display_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            
+            # thumbnail() skips images already small enough; make sure the
+            # pixels are in memory before the file is closed
+            img.load()
+            return img
+    
+    @staticmethod
+    def _render_preview_vips(image_path):
+        """Render the preview with libvips, or None if the result is not 8-bit."""
+        thumb = pyvips.Image.thumbnail(image_path, 300, height=300, size='down')
+        mode = {1: 'L', 2: 'LA', 3: 'RGB', 4: 'RGBA'}.get(thumb.bands)
+        if thumb.format != 'uchar' or mode is None:
+            return None
+        return Image.frombytes(mode, (thumb.width, thumb.height), thumb.write_to_memory())
     
     def calculate_display_size(self, original_size, max_size):
         """Calculate display size maintaining aspect ratio."""
@@ -368,7 +568,8 @@ class ImageCompressorGUI:
     
     def clear_preview(self):
         """Clear the image preview."""
-        self.preview_canvas.delete("all")
+        self._preview_token += 1  # Drop any preview still being decoded
+        self.preview_canvas.itemconfigure(self._preview_item, image="")
         self.preview_info.config(text="Select an image to preview")
         self.current_preview_path = None
     
@@ -388,6 +589,11 @@ class ImageCompressorGUI:
         
         # Clear results
         self.results_text.delete(1.0, tk.END)
+        self._results_history.clear()
+        
+        self._cancel_event.clear()
+        self._running = True
+        self._poll_soon()
         
         # Start compression thread
         self.compression_thread = threading.Thread(target=self.compression_worker, daemon=True)
@@ -396,40 +602,62 @@ class ImageCompressorGUI:
     def compression_worker(self):
         """Worker thread for image compression."""
         try:
+            # Read the settings once; each .get() is a round trip into Tcl
+            out_dir = self.output_directory.get()
+            target_fmt_raw = self.target_format.get()
+            target_fmt = None if target_fmt_raw == "same" else target_fmt_raw
+            
             # Update compressor auto-repair setting
             self.compressor.auto_repair = self.auto_repair.get()
             
-            target_fmt = None if self.target_format.get() == "same" else self.target_format.get()
+            compress_kwargs = {
+                'quality_preset': self.quality_preset.get(),
+                'target_format': target_fmt,
+                'preserve_exif': self.preserve_exif.get()
+            }
             
-            # Process each file
-            total_files = len(self.selected_files)
-            successful = 0
-            repaired_count = 0
+            # Outputs of earlier runs with the same inputs and settings
+            cache_path = os.path.join(out_dir, COMPRESS_CACHE_NAME)
+            cache = self._load_compress_cache(cache_path)
+            cache_keys = {}
             
-            for i, file_path in enumerate(self.selected_files):
-                # Update progress
-                progress = (i / total_files) * 100
-                self.progress_queue.put(("progress", progress))
-                self.progress_queue.put(("status", f"Processing: {Path(file_path).name}"))
-                
-                # Determine output path
-                filename = Path(file_path).stem
-                ext = target_fmt if target_fmt else Path(file_path).suffix.lstrip('.')
-                output_path = os.path.join(self.output_directory.get(), f"{filename}_compressed.{ext}")
+            # Determine output paths, skipping files whose output is current
+            jobs = []
+            total_files = len(self.selected_files)
+            unchanged = 0
+            for file_path in self.selected_files:
+                # Split the name once with os.path; no Path objects per file
+                name = os.path.basename(file_path)
+                filename, dot_ext = os.path.splitext(name)
+                ext = target_fmt if target_fmt else dot_ext.lstrip('.')
+                output_path = os.path.join(out_dir, f"{filename}_compressed.{ext}")
                 
-                # Compress image
-                result = self.compressor.compress_image(
-                    file_path,
-                    output_path,
-                    quality_preset=self.quality_preset.get(),
-                    target_format=target_fmt,
-                    preserve_exif=self.preserve_exif.get()
-                )
+                try:
+                    key = _compress_cache_key(file_path, os.stat(file_path), compress_kwargs)
+                except OSError:
+                    key = None  # Missing input; compress_image reports it
+                if key is not None and key in cache and cache[key] == self._output_signature(output_path):
+                    unchanged += 1
+                    self.progress_queue.put(("result", f"⏭️ {name}: "
+                                                       f"unchanged, kept existing output"))
+                    continue
                 
+                cache_keys[file_path] = key
+                jobs.append((file_path, output_path))
+            
+            # Process each file
+            successful = unchanged
+            repaired_count = 0
+            
+            for done, (file_path, result) in enumerate(self._compress_files(jobs, compress_kwargs),
+                                                       unchanged + 1):
                 # Report result
+                name = os.path.basename(file_path)
                 if result['success']:
                     successful += 1
-                    message = (f"✅ {Path(file_path).name}: "
+                    if cache_keys[file_path] is not None:
+                        cache[cache_keys[file_path]] = self._output_signature(result['output_path'])
+                    message = (f"✅ {name}: "
                              f"{result['compression_ratio']:.1f}% reduction "
                              f"({format_size(result['original_size'])} → "
                              f"{format_size(result['compressed_size'])})")
@@ -440,16 +668,30 @@ class ImageCompressorGUI:
                         repair_method = result.get('repair_method', 'unknown method')
                         message += f"\n   🔧 Auto-repaired using: {repair_method}"
                 else:
-                    message = f"❌ {Path(file_path).name}: {result['error']}"
+                    message = f"❌ {name}: {result['error']}"
                 
                 self.progress_queue.put(("result", message))
+                self.progress_queue.put(("progress", (done / total_files) * 100))
+            
+            if successful > unchanged:
+                self._save_compress_cache(cache_path, cache)
+            
+            if self._cancel_event.is_set():
+                self.progress_queue.put(("stopped", f"Compression stopped: "
+                                                    f"{successful}/{total_files} files processed"))
+                return
             
             # Final progress
             self.progress_queue.put(("progress", 100))
             
             completion_msg = f"Compression complete: {successful}/{total_files} files processed"
+            notes = []
+            if unchanged > 0:
+                notes.append(f"{unchanged} unchanged")
             if repaired_count > 0:
-                completion_msg += f" ({repaired_count} auto-repaired)"
+                notes.append(f"{repaired_count} auto-repaired")
+            if notes:
+                completion_msg += f" ({', '.join(notes)})"
             
             self.progress_queue.put(("complete", completion_msg))
             
@@ -460,46 +702,194 @@ class ImageCompressorGUI:
             if hasattr(self.compressor, 'cleanup_temp_files'):
                 self.compressor.cleanup_temp_files()
     
+    @staticmethod
+    def _output_signature(output_path: str) -> Optional[List]:
+        """[path, mtime_ns, size] of an output file, or None if it is missing.
+        
+        Cached entries store this so an output overwritten by a run with
+        other settings (or deleted) is not mistaken for a current one.
+        """
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return None
+        return [output_path, st.st_mtime_ns, st.st_size]
+    
+    @staticmethod
+    def _load_compress_cache(cache_path: str) -> Dict[str, List]:
+        """Read the output directory's compression cache (empty if none)."""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _save_compress_cache(cache_path: str, cache: Dict[str, List]):
+        """Write the compression cache back; failure only costs a re-run."""
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+        except OSError:
+            pass
+    
+    def _compress_files(self, jobs: List[Tuple[str, str]],
+                        kwargs: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Compress (input, output) pairs, yielding results as they finish.
+        
+        Files are spread over one process per CPU; a single file (or a
+        single CPU) is compressed in this thread to skip pool startup.
+        Once the cancel event is set no further files are started; files
+        already being compressed are finished and reported.
+        """
+        workers = min(os.cpu_count() or 1, len(jobs))
+        if workers <= 1:
+            for file_path, output_path in jobs:
+                if self._cancel_event.is_set():
+                    return
+                self.progress_queue.put(("status", f"Processing: {os.path.basename(file_path)}"))
+                yield file_path, self.compressor.compress_image(file_path, output_path, **kwargs)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self._cancel_event,
+                                           self.compressor.auto_repair)) as executor:
+            futures = {executor.submit(_compress_one, file_path, output_path, kwargs): file_path
+                       for file_path, output_path in jobs}
+            cancelled = False
+            for future in as_completed(futures):
+                if not cancelled and self._cancel_event.is_set():
+                    # Drop everything not yet handed to a worker
+                    for pending in futures:
+                        pending.cancel()
+                    cancelled = True
+                if future.cancelled():
+                    continue
+                
+                file_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # e.g. a worker process died; report it like any other failure
+                    result = {'success': False, 'error': str(e)}
+                if not result.get('cancelled', False):
+                    yield file_path, result
+    
     def stop_compression(self):
-        """Stop the compression process."""
-        # Note: This is a simplified stop - in a real implementation,
-        # you'd need more sophisticated thread management
-        self.compress_button.config(state=tk.NORMAL)
+        """Stop the compression process.
+        
+        No new files are started; the worker posts a "stopped" message
+        once the files already in progress are done, which re-enables the
+        Start button.
+        """
+        self._cancel_event.set()
         self.stop_button.config(state=tk.DISABLED)
-        self.progress_var.set(0)
+    
+    def save_log(self):
+        """Save the full results of the current run to a text file."""
+        if not self._results_history:
+            messagebox.showinfo("Save Log", "There are no results to save yet.")
+            return
+        
+        path = filedialog.asksaveasfilename(
+            title="Save Log",
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(self._results_history) + "\n")
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save log: {e}")
+    
+    def _scroll_results_to_end(self):
+        """Idle callback scheduled by check_progress_queue."""
+        self._see_pending = False
+        self.results_text.see(tk.END)
     
     def check_progress_queue(self):
-        """Check for progress updates from the compression thread."""
+        """Check for progress updates from the compression thread.
+        
+        Handles at most PROGRESS_DRAIN_LIMIT messages per tick and applies
+        them as one text insert and one progress update, so a burst of
+        results costs the same redraw work as a single one.
+        """
+        result_lines = []
+        progress = None
+        finished = None
         try:
-            while True:
+            for _ in range(PROGRESS_DRAIN_LIMIT):
                 msg_type, msg_data = self.progress_queue.get_nowait()
                 
                 if msg_type == "progress":
-                    self.progress_var.set(msg_data)
+                    progress = msg_data
                 elif msg_type == "status":
                     # Could add status label if needed
                     pass
                 elif msg_type == "result":
-                    self.results_text.insert(tk.END, msg_data + "\n")
-                    self.results_text.see(tk.END)
+                    result_lines.append(msg_data)
+                elif msg_type == "preview":
+                    self._previews_pending -= 1
+                    self._on_preview_decoded(*msg_data)
+                elif msg_type == "preview_error":
+                    self._previews_pending -= 1
+                    token, error = msg_data
+                    if token == self._preview_token:
+                        self._show_preview_error(error)
                 elif msg_type == "complete":
-                    self.results_text.insert(tk.END, f"\n{msg_data}\n")
-                    self.results_text.see(tk.END)
+                    self._running = False
+                    result_lines.append(f"\n{msg_data}")
+                    finished = (messagebox.showinfo, "Complete", msg_data)
+                    break
+                elif msg_type == "stopped":
+                    self._running = False
+                    result_lines.append(f"\n🛑 {msg_data}")
                     self.compress_button.config(state=tk.NORMAL)
-                    self.stop_button.config(state=tk.DISABLED)
-                    messagebox.showinfo("Complete", msg_data)
                 elif msg_type == "error":
-                    self.results_text.insert(tk.END, f"\n❌ {msg_data}\n")
-                    self.results_text.see(tk.END)
-                    self.compress_button.config(state=tk.NORMAL)
-                    self.stop_button.config(state=tk.DISABLED)
-                    messagebox.showerror("Error", msg_data)
+                    self._running = False
+                    result_lines.append(f"\n❌ {msg_data}")
+                    finished = (messagebox.showerror, "Error", msg_data)
+                    break
                 
         except queue.Empty:
             pass
         
-        # Schedule next check
-        self.root.after(100, self.check_progress_queue)
+        if result_lines:
+            # Follow new output only if the user has not scrolled up
+            at_bottom = self.results_text.yview()[1] > 0.98
+            self.results_text.insert(tk.END, "\n".join(result_lines) + "\n")
+            self._results_history.extend(result_lines)
+            
+            # Keep the widget small; Tk inserts slow down as it grows
+            line_count = int(self.results_text.index('end-1c').split('.')[0])
+            if line_count > MAX_DISPLAYED_LINES:
+                self.results_text.delete('1.0', f'{line_count - MAX_DISPLAYED_LINES + 1}.0')
+            if at_bottom and not self._see_pending:
+                self._see_pending = True
+                self.root.after_idle(self._scroll_results_to_end)
+        if progress is not None:
+            self.progress_var.set(progress)
+        
+        if finished:
+            self.compress_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.DISABLED)
+            show_dialog, title, message = finished
+            show_dialog(title, message)
+        
+        # Schedule next check; back off while nothing is in flight so an
+        # idle window does not keep waking the interpreter
+        busy = self._running or self._previews_pending > 0
+        self._poll_job = self.root.after(POLL_ACTIVE_MS if busy else POLL_IDLE_MS,
+                                         self.check_progress_queue)
+    
+    def _poll_soon(self):
+        """Move the next queue check forward to the fast interval."""
+        self.root.after_cancel(self._poll_job)
+        self._poll_job = self.root.after(POLL_ACTIVE_MS, self.check_progress_queue)
 
 def main():
     """Main entry point for the GUI application."""
@@ -5,85 +5,394 @@ Reduces file size while maintaining quality and resolution using optimal compres
 
 import os
 import sys
-from PIL import Image, ImageFile
+import PIL
+from PIL import (Image, ImageFile, BmpImagePlugin, JpegImagePlugin, PngImagePlugin,
+                 TiffImagePlugin, features)
 from PIL.ExifTags import TAGS
+import hashlib
+import io
+import mmap
 import logging
-from typing import Dict, Tuple, Optional, List
+import math
+import struct
+from typing import Dict, FrozenSet, Iterator, Tuple, Optional, List
 from pathlib import Path
 import tempfile
 import shutil
+from stat import S_ISDIR, S_ISREG
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.util import Finalize
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import lru_cache
+from itertools import repeat
+from types import MappingProxyType
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# pillow-simd installs as PIL too; its releases carry a .postN suffix
+PILLOW_SIMD = '.post' in PIL.__version__
+
+# Oldest libjpeg-turbo major version with the current SIMD encoder paths
+MIN_LIBJPEG_TURBO = 3
+
+# Directory names never descended into when scanning for images; hidden
+# directories (leading dot) are skipped as well
+EXCLUDE_DIRS = frozenset({'.git', '__pycache__', '.venv', 'node_modules'})
+
+
+def _check_jpeg_codec() -> None:
+    """Warn when Pillow's JPEG codec will make encode/decode slow.
+    
+    libjpeg-turbo (which the official Pillow wheels bundle) is ~2-6x faster
+    than plain libjpeg; the README explains how to get a faster build.
+    """
+    try:
+        has_turbo = features.check_feature('libjpeg_turbo')
+    except ValueError:
+        return  # Pillow too old to report the feature
+    
+    if not has_turbo:
+        logger.warning("libjpeg-turbo not detected; JPEG decode/encode will be ~2-6x slower. "
+                       "See README for a faster Pillow/pillow-simd build.")
+        return
+    
+    version = features.version('libjpeg_turbo')
+    try:
+        major = int(version.split('.')[0])
+    except (AttributeError, ValueError):
+        return
+    if major < MIN_LIBJPEG_TURBO:
+        logger.warning(f"libjpeg-turbo {version} is older than {MIN_LIBJPEG_TURBO}.0; "
+                       f"upgrade Pillow for faster JPEG encode/decode.")
+
+
+_check_jpeg_codec()
+
+@lru_cache(maxsize=16)
+def _jpeg_qtables(quality: int) -> Tuple[Tuple[int, ...], ...]:
+    """The luma and chroma quantization tables Pillow's encoder uses at quality."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (16, 16)).save(buffer, 'JPEG', quality=quality)
+    with Image.open(buffer) as probe:
+        return tuple(tuple(probe.quantization[i]) for i in sorted(probe.quantization))
+
+
+# Inputs larger than this are decoded from a read-only memory map
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+
+@contextmanager
+def _open_image(path: str, file_size: int):
+    """Open an image, reading large files through mmap instead of read()."""
+    if file_size <= MMAP_THRESHOLD:
+        with Image.open(path) as img:
+            yield img
+        return
+    
+    # mmap has read/seek/tell, so Pillow can decode straight from the
+    # mapping without copying it into a bytes object first
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            Image.open(mm) as img:
+        yield img
+
+
+def _prefetch_file(path: str) -> None:
+    """Pull a file into the OS page cache ahead of decoding it."""
+    try:
+        with open(path, 'rb') as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                while f.read(1024 * 1024):
+                    pass
+    except OSError:
+        pass  # compress_image reports unreadable files itself
+
+
+# Leading bytes of each supported format, for rejecting non-images cheaply
+_MAGIC_SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'II*\x00', 'TIFF'),
+    (b'MM\x00*', 'TIFF'),
+    (b'BM', 'BMP'),
+)
+
+
+def _sniff_format(head: bytes) -> Optional[str]:
+    """Identify a supported format from the first bytes of a file."""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'WEBP'
+    for magic, fmt in _MAGIC_SIGNATURES:
+        if head.startswith(magic):
+            return fmt
+    return None
+
+
+# Sniffed format -> the factory Image.open would pick; JPEG keeps jpeg_factory
+# so MPO files still open as MpoImageFile
+_FAST_OPENERS = {
+    'JPEG': JpegImagePlugin.jpeg_factory,
+    'PNG': PngImagePlugin.PngImageFile,
+    'TIFF': TiffImagePlugin.TiffImageFile,
+    'BMP': BmpImagePlugin.BmpImageFile,
+}
+if features.check('webp'):
+    from PIL import WebPImagePlugin
+    _FAST_OPENERS['WEBP'] = WebPImagePlugin.WebPImageFile
+
+
+def _fast_open(fp, head: bytes) -> Image.Image:
+    """Image.open without the plugin scan when the magic bytes are known.
+    
+    Anything unrecognised or rejected by the plugin goes through Image.open,
+    so errors for bad files read exactly as before.
+    """
+    factory = _FAST_OPENERS.get(_sniff_format(head))
+    if factory is not None:
+        try:
+            img = factory(fp, '')
+        except (SyntaxError, IndexError, TypeError, struct.error):
+            pass
+        else:
+            Image._decompression_bomb_check(img.size)
+            return img
+        fp.seek(0)
+    return Image.open(fp)
+
+
+class _ImageSession:
+    """One input file shared by the validate/info/compress stages.
+    
+    Stats the file once, opens it at most once for headers and decodes it at
+    most once. Only pixels wanted after verify() (which leaves the Image
+    unusable for decoding) make it reopen the file.
+    """
+    __slots__ = ('path', 'stat', '_head', '_source', '_img', '_loaded', '_verified', '_stack')
+    
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            self.stat = os.stat(path)
+        except OSError:
+            self.stat = None
+        self._head = None
+        self._source = None
+        self._img = None
+        self._loaded = False
+        self._verified = False
+        self._stack = ExitStack()
+    
+    def _open(self) -> None:
+        self.close()
+        f = self._stack.enter_context(open(self.path, 'rb'))
+        self._head = f.read(16)
+        f.seek(0)
+        
+        self._source = f
+        if self.stat is not None and self.stat.st_size > MMAP_THRESHOLD:
+            # Decode straight from the page cache, as _open_image does
+            self._source = self._stack.enter_context(
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    
+    def head(self) -> bytes:
+        """First 16 bytes of the file."""
+        if self._head is None:
+            self._open()
+        return self._head
+    
+    def img(self, load: bool = False) -> Image.Image:
+        """The opened Image; with load=True, decoded as well."""
+        if self._head is None or (load and self._verified):
+            self._open()
+        if self._img is None:
+            self._img = self._stack.enter_context(_fast_open(self._source, self._head))
+        if load and not self._loaded:
+            self._img.load()
+            self._loaded = True
+        return self._img
+    
+    def verify(self) -> None:
+        """Let Pillow check the file structure without decoding pixels.
+        
+        Header attributes stay readable afterwards.
+        """
+        self.img().verify()
+        self._verified = True
+    
+    def close(self) -> None:
+        # A decoded Image stays usable; only the file handles go
+        self._stack.close()
+        self._stack = ExitStack()
+        self._head = None
+        self._source = None
+        self._img = None
+        self._loaded = False
+        self._verified = False
+    
+    def __enter__(self) -> '_ImageSession':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 class ImageCompressor:
     """Advanced image compressor with quality preservation and automatic repair."""
     
     # Supported image formats
     SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.webp', '.tiff', '.bmp'}
+    # The same extensions as a tuple, for a single str.endswith test per name
+    _SUPPORTED_SUFFIXES = tuple(sorted(SUPPORTED_FORMATS))
     
     # Optimal quality settings for different compression levels
+    # jpeg_subsampling is Pillow's chroma subsampling: 0 = 4:4:4, 1 = 4:2:2, 2 = 4:2:0
     QUALITY_PRESETS = {
-        'maximum': {'jpeg': 95, 'webp': 85, 'png_optimize': True},
-        'high': {'jpeg': 88, 'webp': 80, 'png_optimize': True},
-        'balanced': {'jpeg': 82, 'webp': 75, 'png_optimize': True},
-        'small': {'jpeg': 75, 'webp': 70, 'png_optimize': True}
+        'maximum': {'jpeg': 95, 'jpeg_subsampling': 0, 'webp': 85, 'webp_method': 6, 'png_optimize': True},
+        'high': {'jpeg': 88, 'jpeg_subsampling': 1, 'webp': 80, 'webp_method': 5, 'png_optimize': True},
+        'balanced': {'jpeg': 82, 'jpeg_subsampling': 2, 'webp': 75, 'webp_method': 4, 'png_optimize': True},
+        'small': {'jpeg': 75, 'jpeg_subsampling': 2, 'webp': 70, 'webp_method': 4, 'png_optimize': True}
     }
     
-    def __init__(self, auto_repair: bool = True):
+    # Fixed encoder settings per format; optimize_* copy and fill these in
+    _SAVE_TEMPLATES = {
+        'jpeg': MappingProxyType({
+            'format': 'JPEG',
+            'optimize': True,
+            'progressive': True,  # Progressive JPEG for better perceived loading
+        }),
+        'png': MappingProxyType({
+            'format': 'PNG',
+            'compress_level': 9,  # Maximum compression
+        }),
+        'webp': MappingProxyType({
+            'format': 'WEBP',
+        }),
+    }
+    
+    def __init__(self, auto_repair: bool = True, max_workers: Optional[int] = None):
         """Initialize the image compressor.
         
         Args:
             auto_repair: Enable automatic repair of corrupted images
+            max_workers: Default process count for compress_batch (None for
+                one per CPU); lower it on shared hosts
         """
         self.processed_files = []
         self.errors = []
         self.auto_repair = auto_repair
+        self.max_workers = max_workers
         self.repaired_files = []  # Track files that were automatically repaired
+        self._validation_cache = {}  # (path, mtime_ns, size) -> validation dict
+        self._repair_cache = {}  # content digest -> (repaired temp file, method) or (None, None)
     
-    def validate_image_file(self, image_path: str) -> Dict:
-        """Validate an image file and return detailed diagnostic info."""
+    def validate_image_file(self, image_path: str, return_image: bool = False,
+                            quick: bool = False, session: Optional[_ImageSession] = None):
+        """Validate an image file and return detailed diagnostic info.
+        
+        Results are cached per (path, mtime, size), so asking again about an
+        unchanged file doesn't decode it again. With return_image=True a
+        (validation, image) tuple is returned instead, where image is the
+        decoded Image for valid files (None otherwise) so callers can reuse it
+        rather than opening the file a second time.
+        
+        quick=True only checks the magic bytes and lets Pillow verify() the
+        headers without decoding any pixels. That is enough for callers that
+        just need format/mode/size, but won't notice a truncated JPEG body.
+        It is ignored when return_image is set.
+        
+        Pass the caller's _ImageSession for image_path as session to share
+        its stat and open file; otherwise a private one is used.
+        """
+        quick = quick and not return_image
+        if session is None:
+            with _ImageSession(image_path) as session:
+                return self.validate_image_file(image_path, return_image, quick, session)
+        
+        st = session.stat
+        cache_key = (image_path, st.st_mtime_ns, st.st_size) if st else None
+        cached, decoded = self._validation_cache.get(cache_key, (None, False))
+        if cached is not None and (decoded or quick):
+            validation_result = dict(cached, suggestions=list(cached['suggestions']))
+            if not return_image:
+                return validation_result
+            if not validation_result['is_valid']:
+                return validation_result, None
+            try:
+                return validation_result, session.img(load=True)
+            except Exception:
+                # Changed under us within the same mtime tick; validate afresh
+                self._validation_cache.pop(cache_key, None)
+                session.close()
+        
+        validation_result, img = self._validate_uncached(session, quick)
+        if cache_key is not None:
+            self._validation_cache[cache_key] = (dict(
+                validation_result, suggestions=list(validation_result['suggestions'])), not quick)
+        if return_image:
+            return validation_result, img
+        return validation_result
+    
+    def _validate_uncached(self, session: _ImageSession,
+                           quick: bool = False) -> Tuple[Dict, Optional[Image.Image]]:
+        """Decode (or with quick, header-check) the file and build its validation dict."""
+        st = session.stat
+        loaded_img = None
         validation_result = {
             'is_valid': False,
             'file_exists': False,
             'file_size': 0,
             'is_readable': False,
             'format_detected': None,
+            'mode': None,
+            'size': None,
             'error_message': None,
             'suggestions': []
         }
         
         try:
             # Check if file exists
-            if not os.path.exists(image_path):
+            if st is None:
                 validation_result['error_message'] = "File does not exist"
                 validation_result['suggestions'].append("Check the file path")
-                return validation_result
+                return validation_result, None
             
             validation_result['file_exists'] = True
-            validation_result['file_size'] = os.path.getsize(image_path)
+            validation_result['file_size'] = st.st_size
             
             # Check if file is empty
             if validation_result['file_size'] == 0:
                 validation_result['error_message'] = "File is empty (0 bytes)"
                 validation_result['suggestions'].append("Re-download or recreate the file")
-                return validation_result
+                return validation_result, None
             
             # Check if file is too small to be a valid image
             if validation_result['file_size'] < 100:
                 validation_result['error_message'] = "File too small to be a valid image"
                 validation_result['suggestions'].append("File may be corrupted or truncated")
-                return validation_result
+                return validation_result, None
             
             # Try to open and verify the image
             try:
-                with Image.open(image_path) as img:
+                if quick:
+                    if _sniff_format(session.head()) is None:
+                        raise Image.UnidentifiedImageError(session.path)
+                    img = session.img()
+                    header = (img.format, img.mode, img.size)
+                    # Walks the file structure without decoding pixels
+                    session.verify()
+                else:
                     # Force loading the image data
-                    img.load()
-                    validation_result['is_readable'] = True
-                    validation_result['format_detected'] = img.format
-                    validation_result['is_valid'] = True
+                    img = session.img(load=True)
+                    header = (img.format, img.mode, img.size)
+                    loaded_img = img
+                
+                validation_result['is_readable'] = True
+                (validation_result['format_detected'], validation_result['mode'],
+                 validation_result['size']) = header
+                validation_result['is_valid'] = True
                     
             except Image.UnidentifiedImageError:
                 validation_result['error_message'] = "Cannot identify image format"
@@ -113,6 +422,14 @@ class ImageCompressor:
                     validation_result['error_message'] = f"PIL/Pillow error: {e}"
                     validation_result['suggestions'].append("Try opening with different image software")
                     
+            except SyntaxError as e:
+                # verify() reports broken chunks and bad checksums this way
+                validation_result['error_message'] = f"Image structure is corrupted: {e}"
+                validation_result['suggestions'].extend([
+                    "File is corrupted or truncated",
+                    "Try re-downloading the image"
+                ])
+                
             except MemoryError:
                 validation_result['error_message'] = "Image too large for available memory"
                 validation_result['suggestions'].extend([
@@ -125,7 +442,7 @@ class ImageCompressor:
             validation_result['error_message'] = f"Unexpected error: {e}"
             validation_result['suggestions'].append("Contact support with this error message")
             
-        return validation_result
+        return validation_result, loaded_img
 
     def attempt_auto_repair(self, image_path: str) -> Optional[str]:
         """Automatically attempt to repair a corrupted image file.
@@ -141,10 +458,27 @@ class ImageCompressor:
         
         logger.info(f"🔧 Attempting automatic repair for {image_path}")
         
+        # Byte-identical copies (deduplicated backups, say) only need repairing once
+        digest = self._file_digest(image_path)
+        cached_file, cached_method = self._repair_cache.get(digest, (None, None))
+        if digest in self._repair_cache and cached_file is None:
+            logger.warning(f"   ❌ All auto-repair methods failed for {image_path} (identical file seen before)")
+            return None
+        
         # Create temporary file for repair attempt
         temp_dir = tempfile.mkdtemp()
         temp_file = os.path.join(temp_dir, f"repaired_{Path(image_path).name}")
         
+        if cached_file and os.path.exists(cached_file):
+            shutil.copyfile(cached_file, temp_file)
+            logger.info(f"   ✅ Reused the {cached_method} repair of an identical file")
+            self.repaired_files.append({
+                'original_path': image_path,
+                'repair_method': cached_method,
+                'temp_file': temp_file
+            })
+            return temp_file
+        
         repair_methods = [
             ("truncated loading", self._repair_truncated),
             ("force RGB conversion", self._repair_force_rgb),
@@ -155,8 +489,9 @@ class ImageCompressor:
             try:
                 logger.info(f"   Trying: {method_name}")
                 if method_func(image_path, temp_file):
-                    # Verify the repaired file
-                    validation = self.validate_image_file(temp_file)
+                    # Verify the repaired file; it was just written by Pillow,
+                    # so checking its structure is enough
+                    validation = self.validate_image_file(temp_file, quick=True)
                     if validation['is_valid']:
                         logger.info(f"   ✅ Auto-repair successful with {method_name}")
                         self.repaired_files.append({
@@ -164,6 +499,8 @@ class ImageCompressor:
                             'repair_method': method_name,
                             'temp_file': temp_file
                         })
+                        if digest is not None:
+                            self._repair_cache[digest] = (temp_file, method_name)
                         return temp_file
                     else:
                         # Remove failed repair attempt
@@ -183,8 +520,21 @@ class ImageCompressor:
             pass
             
         logger.warning(f"   ❌ All auto-repair methods failed for {image_path}")
+        if digest is not None:
+            self._repair_cache[digest] = (None, None)
         return None
     
+    def _file_digest(self, path: str) -> Optional[bytes]:
+        """blake2b digest of a file's contents, or None if it can't be read."""
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.digest()
+    
     def _repair_truncated(self, input_path: str, output_path: str) -> bool:
         """Repair using truncated image loading."""
         original_setting = ImageFile.LOAD_TRUNCATED_IMAGES
@@ -195,12 +545,7 @@ class ImageCompressor:
                 # Save as JPEG with high quality to standardize
                 if img.mode in ('RGBA', 'LA'):
                     # Convert to RGB for JPEG
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'RGBA':
-                        background.paste(img, mask=img.split()[-1])
-                    else:
-                        background.paste(img, mask=img.split()[1])
-                    img = background
+                    img = self._flatten_rgba_to_rgb(img)
                 elif img.mode != 'RGB':
                     img = img.convert('RGB')
                     
@@ -221,12 +566,7 @@ class ImageCompressor:
                 if img.mode != 'RGB':
                     if img.mode in ('RGBA', 'LA'):
                         # Handle transparency
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'RGBA':
-                            background.paste(img, mask=img.split()[-1])
-                        else:
-                            background.paste(img, mask=img.split()[1])
-                        img = background
+                        img = self._flatten_rgba_to_rgb(img)
                     else:
                         img = img.convert('RGB')
                 
@@ -246,14 +586,10 @@ class ImageCompressor:
                 # Create new image without any metadata
                 if img.mode in ('RGBA', 'LA'):
                     # Convert to RGB
-                    new_img = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'RGBA':
-                        new_img.paste(img, mask=img.split()[-1])
-                    else:
-                        new_img.paste(img, mask=img.split()[1])
+                    new_img = self._flatten_rgba_to_rgb(img)
                 else:
-                    new_img = Image.new(img.mode, img.size)
-                    new_img.putdata(list(img.getdata()))
+                    # Copy the raw pixel buffer; info/palette/EXIF stay behind
+                    new_img = Image.frombytes(img.mode, img.size, img.tobytes())
                     if new_img.mode != 'RGB':
                         new_img = new_img.convert('RGB')
                 
@@ -264,10 +600,22 @@ class ImageCompressor:
         finally:
             ImageFile.LOAD_TRUNCATED_IMAGES = original_setting
 
-    def cleanup_temp_files(self):
-        """Clean up any temporary files created during auto-repair."""
-        for repair_info in self.repaired_files:
-            temp_file = repair_info['temp_file']
+    def cleanup_temp_files(self, keep_repair_cache: bool = False):
+        """Clean up any temporary files created during auto-repair.
+        
+        Pool workers pass keep_repair_cache=True after each file so repairs
+        memoized for identical files (and their temp files) survive until
+        the worker exits.
+        """
+        cached_files = {cached for cached, _ in self._repair_cache.values() if cached}
+        temp_files = {repair_info['temp_file'] for repair_info in self.repaired_files}
+        if keep_repair_cache:
+            temp_files -= cached_files
+        else:
+            temp_files |= cached_files
+            self._repair_cache.clear()
+        
+        for temp_file in temp_files:
             if os.path.exists(temp_file):
                 try:
                     os.remove(temp_file)
@@ -282,16 +630,15 @@ class ImageCompressor:
     def get_image_info(self, image_path: str) -> Dict:
         """Get detailed information about an image file."""
         try:
-            # First validate the file
-            validation = self.validate_image_file(image_path)
-            if not validation['is_valid']:
-                logger.warning(f"Invalid image file {image_path}: {validation['error_message']}")
-                return {'validation': validation}
-            
-            with Image.open(image_path) as img:
-                # Force load to catch any data issues early
-                img.load()
+            # First validate the file. Everything reported below comes from
+            # the headers, so don't decode, and read them from the same open
+            with _ImageSession(image_path) as session:
+                validation = self.validate_image_file(image_path, quick=True, session=session)
+                if not validation['is_valid']:
+                    logger.warning(f"Invalid image file {image_path}: {validation['error_message']}")
+                    return {'validation': validation}
                 
+                img = session.img()
                 # Get basic info
                 info = {
                     'format': img.format,
@@ -299,7 +646,7 @@ class ImageCompressor:
                     'size': img.size,
                     'width': img.size[0],
                     'height': img.size[1],
-                    'file_size': os.path.getsize(image_path),
+                    'file_size': validation['file_size'],
                     'has_transparency': img.mode in ('RGBA', 'LA') or 'transparency' in img.info,
                     'validation': validation
                 }
@@ -316,55 +663,65 @@ class ImageCompressor:
                 return info
         except Exception as e:
             logger.error(f"Error getting info for {image_path}: {e}")
-            return {'validation': self.validate_image_file(image_path)}
+            return {'validation': self.validate_image_file(image_path, quick=True)}
     
     def optimize_jpeg(self, img: Image.Image, quality: int = 85, 
-                     preserve_exif: bool = True) -> Dict:
-        """Optimize JPEG compression with advanced settings."""
-        save_kwargs = {
-            'format': 'JPEG',
-            'quality': quality,
-            'optimize': True,
-            'progressive': True,  # Progressive JPEG for better perceived loading
-        }
+                     preserve_exif: bool = True, subsampling: int = 2) -> Dict:
+        """Optimize JPEG compression with advanced settings.
+        
+        subsampling is passed to Pillow as-is (0 = 4:4:4, 1 = 4:2:2,
+        2 = 4:2:0) rather than left to the encoder's default. It only means
+        anything for RGB, which is stored as YCbCr; greyscale and CMYK keep
+        full-resolution components.
+        """
+        save_kwargs = dict(self._SAVE_TEMPLATES['jpeg'], quality=quality)
+        if img.mode == 'RGB':
+            save_kwargs['subsampling'] = subsampling
         
-        # Preserve EXIF data if requested
-        if preserve_exif and hasattr(img, 'info') and 'exif' in img.info:
-            save_kwargs['exif'] = img.info['exif']
+        # Preserve EXIF data (and the resolution, which Pillow otherwise drops) if requested
+        if preserve_exif:
+            exif = img.info.get('exif')
+            if exif:
+                save_kwargs['exif'] = exif
+            dpi = img.info.get('dpi')
+            if dpi:
+                save_kwargs['dpi'] = dpi
         
         return save_kwargs
     
     def optimize_png(self, img: Image.Image, optimize: bool = True) -> Dict:
         """Optimize PNG compression with advanced settings."""
-        save_kwargs = {
-            'format': 'PNG',
-            'optimize': optimize,
-            'compress_level': 9,  # Maximum compression
-        }
+        save_kwargs = dict(self._SAVE_TEMPLATES['png'], optimize=optimize)
         
         # For RGBA images, check if we can reduce to RGB
         if img.mode == 'RGBA':
             # Check if image actually uses transparency
             if not self._has_actual_transparency(img):
                 # Convert to RGB to reduce file size
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[-1])
-                return save_kwargs, rgb_img
+                return save_kwargs, self._flatten_rgba_to_rgb(img)
         
         return save_kwargs, img
     
     def optimize_webp(self, img: Image.Image, quality: int = 80, 
-                     lossless: bool = False) -> Dict:
-        """Optimize WebP compression with advanced settings."""
-        save_kwargs = {
-            'format': 'WEBP',
-            'quality': quality if not lossless else 100,
-            'method': 6,  # Maximum compression effort
-            'lossless': lossless,
-        }
+                     lossless: bool = False, method: int = 6) -> Dict:
+        """Optimize WebP compression with advanced settings.
+        
+        method is libwebp's effort (0-6); 6 squeezes out the last ~1-2% on
+        photos at several times the encode time of 4.
+        """
+        save_kwargs = dict(self._SAVE_TEMPLATES['webp'],
+                           quality=quality if not lossless else 100,
+                           lossless=lossless,
+                           method=method)
         
-        # Use lossless for images with transparency or specific modes
-        if img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
+        # Transparent artwork (logos, screenshots) stays lossless; lossy WebP
+        # carries an alpha plane too, which suits photographic cut-outs far
+        # better than a lossless file several times the size
+        if lossless:
+            pass
+        elif img.mode in ('RGBA', 'LA') and self._looks_like_photo(img):
+            save_kwargs['alpha_quality'] = 100  # Keep the alpha edges exact
+        elif img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
             save_kwargs['lossless'] = True
             save_kwargs['quality'] = 100
         
@@ -375,12 +732,50 @@ class ImageCompressor:
         if img.mode != 'RGBA':
             return False
         
-        # Sample a few pixels to check for transparency
-        alpha_channel = img.split()[-1]
-        alpha_values = list(alpha_channel.getdata())
+        # If all alpha values are 255, no real transparency. getextrema()
+        # scans the alpha band in C, no per-pixel Python objects
+        min_alpha = img.getextrema()[-1][0]
+        return min_alpha < 255
+    
+    def _reencode_cannot_shrink(self, img: Image.Image, quality: int) -> bool:
+        """Whether re-encoding a JPEG at quality can't make the file smaller.
+        
+        True for progressive files (libjpeg always optimizes their Huffman
+        tables) in 4:2:0 or greyscale whose quantization tables are already
+        at least as coarse as the ones quality would use.
+        """
+        if img.format != 'JPEG' or img.mode not in ('RGB', 'L'):
+            return False
+        if not img.info.get('progressive'):
+            return False
+        if img.mode == 'RGB' and JpegImagePlugin.get_sampling(img) != 2:
+            return False
+        
+        source = getattr(img, 'quantization', None)
+        if not source:
+            return False
+        for index, target in enumerate(_jpeg_qtables(quality)[:len(source)]):
+            table = source.get(index)
+            if table is None or any(s < t for s, t in zip(table, target)):
+                return False
+        return True
+    
+    def _looks_like_photo(self, img: Image.Image) -> bool:
+        """Guess from a 64x64 nearest-neighbour sample whether img is a photo.
         
-        # If all alpha values are 255, no real transparency
-        return not all(alpha == 255 for alpha in alpha_values[:1000])  # Sample first 1000 pixels
+        Flat artwork reuses a handful of colours; a photo's sample has more
+        than 256 distinct ones.
+        """
+        sample = img.resize((min(img.width, 64), min(img.height, 64)), Image.NEAREST)
+        return sample.getcolors(maxcolors=256) is None
+    
+    def _flatten_rgba_to_rgb(self, img: Image.Image) -> Image.Image:
+        """Composite an RGBA/LA image onto white and return it as RGB."""
+        # Blend straight into an RGB canvas through the alpha band alone;
+        # no RGBA canvas, no split() copies of the colour bands
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
     
     def compress_image(self, input_path: str, output_path: str = None, 
                       quality_preset: str = 'balanced', 
@@ -401,13 +796,23 @@ class ImageCompressor:
         Returns:
             Dictionary with compression results
         """
+        session = _ImageSession(input_path)
         try:
             # Initialize variables
             was_repaired = False
             actual_input_path = input_path
+            if target_format:
+                target_format = target_format.lower()
+            
+            # Reject unsupported extensions before validation decodes anything
+            source = Path(input_path)
+            file_ext = source.suffix.lower()
+            if file_ext not in self.SUPPORTED_FORMATS:
+                raise ValueError(f"Unsupported format: {file_ext}")
             
             # Validate input file first
-            validation = self.validate_image_file(input_path)
+            validation, loaded_img = self.validate_image_file(
+                input_path, return_image=True, session=session)
             if not validation['is_valid']:
                 # Attempt automatic repair if enabled
                 if self.auto_repair:
@@ -431,7 +836,7 @@ class ImageCompressor:
                             'validation': validation,
                             'suggestions': validation['suggestions'] + [
                                 "Auto-repair was attempted but failed",
-                                "Try using the diagnostic tool manually: python diagnostic.py " + Path(input_path).name,
+                                "Try using the diagnostic tool manually: python diagnostic.py " + source.name,
                                 "Consider using professional image repair software"
                             ]
                         }
@@ -456,22 +861,21 @@ class ImageCompressor:
                 actual_input_path = input_path
                 was_repaired = False
             
-            file_ext = Path(input_path).suffix.lower()
-            if file_ext not in self.SUPPORTED_FORMATS:
-                raise ValueError(f"Unsupported format: {file_ext}")
-            
             # Set output path if not provided
             if output_path is None:
-                name = Path(input_path).stem
                 ext = target_format if target_format else file_ext.lstrip('.')
-                output_path = str(Path(input_path).parent / f"{name}_compressed.{ext}")
+                output_path = str(source.parent / f"{source.stem}_compressed.{ext}")
             
             # Get original file info
-            original_size = os.path.getsize(input_path)
+            original_size = validation['file_size']
             
-            # Open and process image with enhanced error handling
+            # Open and process image with enhanced error handling. A valid
+            # input was already decoded by validate_image_file; only a
+            # repaired temp file needs opening here.
             try:
-                with Image.open(actual_input_path) as img:
+                if loaded_img is None:
+                    loaded_img = Image.open(actual_input_path)
+                with loaded_img as img:
                     # Force load the image data to catch corruption early
                     img.load()
                     
@@ -484,58 +888,79 @@ class ImageCompressor:
                             img = img.convert('RGBA')
                         
                         if img.mode in ('RGBA', 'LA'):
-                            # Create white background
-                            background = Image.new('RGB', img.size, (255, 255, 255))
-                            if img.mode == 'RGBA':
-                                background.paste(img, mask=img.split()[-1])
-                            else:
-                                background.paste(img, mask=img.split()[1])
-                            img = background
+                            # Composite onto white background
+                            img = self._flatten_rgba_to_rgb(img)
                         else:
                             img = img.convert('RGB')
                     
                     # Determine target format
                     if target_format is None:
-                        if original_format.lower() == 'jpeg':
-                            target_format = 'jpeg'
-                        elif original_format.lower() == 'png':
+                        if original_format == 'PNG':
                             target_format = 'png'
                         else:
-                            target_format = 'jpeg'  # Default to JPEG for other formats
+                            target_format = 'jpeg'  # JPEG, and the default for other formats
                     
                     # Get quality settings
                     quality_settings = self.QUALITY_PRESETS.get(quality_preset, self.QUALITY_PRESETS['balanced'])
                     
-                    # Optimize based on target format
-                    compressed_img = img.copy()
+                    # A progressive JPEG already quantized at least as coarsely
+                    # as the preset can't come out smaller; don't encode at all
+                    keep_original = (target_format == 'jpeg' and preserve_exif
+                                     and not was_repaired and not max_size_mb
+                                     and self._reencode_cannot_shrink(img, quality_settings['jpeg']))
                     
-                    if target_format.lower() == 'jpeg':
+                    # Optimize based on target format. The optimizers only read
+                    # the image (optimize_png returns a new one when it flattens),
+                    # so there's no need to encode from a copy
+                    if keep_original:
+                        pass
+                    elif target_format == 'jpeg':
                         save_kwargs = self.optimize_jpeg(
-                            compressed_img, 
+                            img, 
                             quality_settings['jpeg'], 
-                            preserve_exif
+                            preserve_exif,
+                            subsampling=quality_settings['jpeg_subsampling']
                         )
                         
-                    elif target_format.lower() == 'png':
-                        save_kwargs, compressed_img = self.optimize_png(
-                            compressed_img, 
+                    elif target_format == 'png':
+                        save_kwargs, img = self.optimize_png(
+                            img, 
                             quality_settings['png_optimize']
                         )
                         
-                    elif target_format.lower() == 'webp':
+                    elif target_format == 'webp':
                         save_kwargs = self.optimize_webp(
-                            compressed_img, 
-                            quality_settings['webp']
+                            img, 
+                            quality_settings['webp'],
+                            method=quality_settings['webp_method']
                         )
                     
-                    # Adjust quality if max_size_mb is specified
-                    if max_size_mb:
-                        save_kwargs = self._adjust_quality_for_size(
-                            compressed_img, save_kwargs, max_size_mb * 1024 * 1024
-                        )
+                    if not keep_original:
+                        # Adjust quality if max_size_mb is specified; the size
+                        # search hands back its encode of the chosen quality
+                        encoded = None
+                        if max_size_mb:
+                            save_kwargs, encoded = self._adjust_quality_for_size(
+                                img, save_kwargs, max_size_mb * 1024 * 1024
+                            )
+                        if encoded is None:
+                            encoded = io.BytesIO()
+                            img.save(encoded, **save_kwargs)
+                        
+                        # Never write a bigger file in the same format
+                        keep_original = (original_format == save_kwargs['format']
+                                         and preserve_exif and not was_repaired
+                                         and encoded.tell() >= original_size)
                     
                     # Save compressed image
-                    compressed_img.save(output_path, **save_kwargs)
+                    if keep_original:
+                        try:
+                            shutil.copyfile(input_path, output_path)
+                        except shutil.SameFileError:
+                            pass  # Compressing in place; the original is already there
+                    else:
+                        with open(output_path, 'wb') as f:
+                            f.write(encoded.getbuffer())
                     
             except OSError as e:
                 if "broken data stream" in str(e).lower():
@@ -599,7 +1024,8 @@ class ImageCompressor:
                 'original_format': original_format,
                 'target_format': target_format.upper(),
                 'quality_preset': quality_preset,
-                'was_auto_repaired': was_repaired
+                'was_auto_repaired': was_repaired,
+                'kept_original': keep_original
             }
             
             if was_repaired:
@@ -624,70 +1050,113 @@ class ImageCompressor:
                 'input_path': input_path,
                 'error': str(e)
             }
+        finally:
+            session.close()
     
     def _adjust_quality_for_size(self, img: Image.Image, save_kwargs: Dict, 
-                                target_size: int) -> Dict:
-        """Adjust quality settings to meet target file size."""
-        import io
+                                target_size: int) -> Tuple[Dict, Optional[io.BytesIO]]:
+        """Adjust quality settings to meet target file size.
         
+        Returns the settings plus the search's own encode with exactly those
+        settings (None if there isn't one), so the caller can write it out
+        instead of encoding the full image once more.
+        """
         if save_kwargs['format'] not in ['JPEG', 'WEBP']:
-            return save_kwargs  # Can't adjust quality for PNG
+            return save_kwargs, None  # Can't adjust quality for PNG
         
-        # Binary search for optimal quality
-        min_quality = 10
-        max_quality = save_kwargs.get('quality', 85)
-        best_kwargs = save_kwargs.copy()
+        encodings = {}
         
-        for _ in range(10):  # Max 10 iterations
-            current_quality = (min_quality + max_quality) // 2
-            test_kwargs = save_kwargs.copy()
-            test_kwargs['quality'] = current_quality
-            
-            # Test file size
+        def encoded_size(quality: int) -> int:
             buffer = io.BytesIO()
-            img.save(buffer, **test_kwargs)
-            current_size = buffer.tell()
+            img.save(buffer, **dict(save_kwargs, quality=quality))
+            encodings[quality] = buffer
+            return buffer.tell()
+        
+        # Bracket the target with the lowest and the requested quality
+        low_q, high_q = 10, save_kwargs.get('quality', 85)
+        if high_q <= low_q:
+            return save_kwargs, None
+        high_size = encoded_size(high_q)
+        unchanged = encodings[high_q] if 'quality' in save_kwargs else None
+        if high_size <= target_size:
+            return save_kwargs, unchanged
+        low_size = encoded_size(low_q)
+        if low_size > target_size:
+            return save_kwargs, unchanged  # Even the lowest quality is too big
+        
+        # Regula falsi on log(size): interpolate inside the bracket instead
+        # of bisecting blindly. When the same end moves twice in a row the
+        # other end's weight is halved (Illinois) so the search can't stall.
+        log_target = math.log(target_size)
+        low_err = math.log(max(low_size, 1)) - log_target
+        high_err = math.log(high_size) - log_target
+        last_fit = None
+        for _ in range(8):
+            if high_q - low_q <= 1:
+                break
+            fraction = -low_err / (high_err - low_err)
+            quality = low_q + int(round((high_q - low_q) * fraction))
+            quality = min(max(quality, low_q + 1), high_q - 1)
             
-            if current_size <= target_size:
-                best_kwargs = test_kwargs.copy()
-                min_quality = current_quality + 1
+            size = encoded_size(quality)
+            error = math.log(max(size, 1)) - log_target
+            if size <= target_size:
+                low_q, low_err = quality, error
+                if last_fit is True:
+                    high_err /= 2
+                last_fit = True
+                if size >= target_size * 0.97:
+                    break  # Close enough to the target
             else:
-                max_quality = current_quality - 1
-            
-            if min_quality >= max_quality:
-                break
+                high_q, high_err = quality, error
+                if last_fit is False:
+                    low_err /= 2
+                last_fit = False
         
-        return best_kwargs
+        best_kwargs = save_kwargs.copy()
+        best_kwargs['quality'] = low_q
+        return best_kwargs, encodings[low_q]
     
     def compress_batch(self, input_paths: List[str], output_dir: str = None,
                       quality_preset: str = 'balanced',
                       target_format: str = None,
-                      preserve_structure: bool = True) -> Dict:
+                      preserve_structure: bool = True,
+                      workers: Optional[int] = None,
+                      keep_results: bool = True) -> Dict:
         """
         Compress multiple images in batch.
         
+        Files are compressed in a process pool of ``workers`` processes
+        (default: the compressor's max_workers, else one per CPU);
+        ``workers=1`` compresses them in-process.
+        
         Args:
             input_paths: List of input image paths or directories
             output_dir: Directory to save compressed images
             quality_preset: Quality preset for compression
             target_format: Target format for all images
             preserve_structure: Whether to preserve directory structure
+            workers: Number of worker processes (None for max_workers)
+            keep_results: Include every per-file result dict in the returned
+                'results' list; pass False on huge batches to only get totals
         
         Returns:
             Dictionary with batch processing results
         """
         all_files = []
+        input_dirs = set()
         
-        # Collect all image files
+        # Collect all image files; one stat per input tells file from directory
         for path in input_paths:
-            if os.path.isfile(path):
+            try:
+                mode = os.stat(path).st_mode
+            except OSError:
+                continue
+            if S_ISREG(mode):
                 all_files.append(path)
-            elif os.path.isdir(path):
-                for root, dirs, files in os.walk(path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        if Path(file_path).suffix.lower() in self.SUPPORTED_FORMATS:
-                            all_files.append(file_path)
+            elif S_ISDIR(mode):
+                input_dirs.add(path)
+                all_files.extend(self._iter_image_files(path))
         
         # Set output directory
         if output_dir is None:
@@ -695,42 +1164,93 @@ class ImageCompressor:
         
         os.makedirs(output_dir, exist_ok=True)
         
-        # Process each file
-        results = []
-        for i, file_path in enumerate(all_files):
-            logger.info(f"Processing {i+1}/{len(all_files)}: {file_path}")
-            
-            # Determine output path
-            if preserve_structure and len(input_paths) == 1 and os.path.isdir(input_paths[0]):
-                # Preserve directory structure
+        # Work out every output path up front so workers only compress, and
+        # so inputs that would write the same file are caught before encoding
+        preserve = preserve_structure and len(input_paths) == 1 and input_paths[0] in input_dirs
+        tasks = []
+        collisions = []
+        claimed = {}
+        made_dirs = {output_dir}
+        for file_path in all_files:
+            if preserve:
+                # Preserve directory structure, creating each folder once
                 rel_path = os.path.relpath(file_path, input_paths[0])
                 output_path = os.path.join(output_dir, rel_path)
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                parent = os.path.dirname(output_path)
+                if parent not in made_dirs:
+                    os.makedirs(parent, exist_ok=True)
+                    made_dirs.add(parent)
             else:
                 # Flat structure
-                filename = Path(file_path).name
-                output_path = os.path.join(output_dir, filename)
+                output_path = os.path.join(output_dir, os.path.basename(file_path))
+            first = claimed.get(output_path)
+            if first is not None:
+                # The same input listed twice is compressed once; a different
+                # input with the same output name is reported, not raced
+                if first != file_path:
+                    error_msg = f"Output {output_path} is already written for {first}"
+                    logger.warning(f"Skipping {file_path}: {error_msg}")
+                    collisions.append({
+                        'success': False,
+                        'input_path': file_path,
+                        'error': error_msg,
+                        'suggestions': ["Rename the file or keep the directory structure"]
+                    })
+                    self.errors.append(error_msg)
+                continue
+            claimed[output_path] = file_path
+            tasks.append((file_path, output_path))
+        compress_kwargs = {'quality_preset': quality_preset, 'target_format': target_format}
+        
+        # Never more workers than tasks; chunksize below uses the same count
+        workers = min(workers or self.max_workers or os.cpu_count() or 1, max(1, len(tasks)))
+        in_process = workers == 1 or len(tasks) <= 1
+        pool = (nullcontext() if in_process else
+                ProcessPoolExecutor(max_workers=workers,
+                                    initializer=_init_worker, initargs=(self.auto_repair,)))
+        
+        # Process each file, totalling as results arrive
+        results = list(collisions) if keep_results else []
+        successful = 0
+        total_original_size = total_compressed_size = 0
+        with pool as executor:
+            if in_process:
+                outcomes = self._compress_prefetching(tasks, compress_kwargs)
+            else:
+                # About four chunks per worker: pickling is amortized over
+                # many small task tuples yet the tail still balances
+                chunksize = max(1, len(tasks) // (4 * workers))
+                inputs, outputs = zip(*tasks)
+                outcomes = executor.map(_compress_one_worker, inputs, outputs,
+                                        repeat(compress_kwargs), chunksize=chunksize)
             
-            # Compress image
-            result = self.compress_image(
-                file_path, output_path, quality_preset, target_format
-            )
-            results.append(result)
+            for i, result in enumerate(outcomes):
+                logger.info(f"Processed {i+1}/{len(tasks)}: {tasks[i][0]}")
+                if keep_results:
+                    results.append(result)
+                succeeded = result.get('success', False)
+                if succeeded:
+                    successful += 1
+                    total_original_size += result.get('original_size', 0)
+                    total_compressed_size += result.get('compressed_size', 0)
+                # Workers record into their own compressor; mirror that here
+                if not in_process:
+                    if succeeded:
+                        self.processed_files.append(result)
+                    else:
+                        self.errors.append(result.get('error'))
         
         # Clean up any temporary files created during auto-repair
         self.cleanup_temp_files()
         
         # Calculate batch statistics
-        successful = [r for r in results if r.get('success', False)]
-        total_original_size = sum(r.get('original_size', 0) for r in successful)
-        total_compressed_size = sum(r.get('compressed_size', 0) for r in successful)
         total_reduction = total_original_size - total_compressed_size
         avg_compression = (total_reduction / total_original_size * 100) if total_original_size > 0 else 0
         
         batch_result = {
-            'total_files': len(all_files),
-            'successful': len(successful),
-            'failed': len(results) - len(successful),
+            'total_files': len(tasks) + len(collisions),
+            'successful': successful,
+            'failed': len(tasks) + len(collisions) - successful,
             'total_original_size': total_original_size,
             'total_compressed_size': total_compressed_size,
             'total_size_reduction': total_reduction,
@@ -739,18 +1259,108 @@ class ImageCompressor:
             'results': results
         }
         
-        logger.info(f"Batch compression complete: {len(successful)}/{len(all_files)} files processed")
+        logger.info(f"Batch compression complete: {successful}/{len(tasks) + len(collisions)} files processed")
         logger.info(f"Total size reduction: {avg_compression:.1f}%")
         
         return batch_result
+    
+    def _compress_prefetching(self, tasks: List[Tuple[str, str]],
+                              compress_kwargs: Dict) -> Iterator[Dict]:
+        """Compress tasks in order while a thread reads the next input ahead.
+        
+        Disk reads for file i+1 overlap the encode of file i. Pool workers
+        don't need this; other processes keep the disk busy meanwhile.
+        """
+        if len(tasks) <= 1:
+            yield from (self.compress_image(*task, **compress_kwargs) for task in tasks)
+            return
+        
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            for i, task in enumerate(tasks):
+                if i + 1 < len(tasks):
+                    reader.submit(_prefetch_file, tasks[i + 1][0])
+                yield self.compress_image(*task, **compress_kwargs)
+    
+    def _iter_image_files(self, directory: str) -> Iterator[str]:
+        """Yield supported image files under directory, in os.walk order."""
+        return _scan_files(directory, self._SUPPORTED_SUFFIXES)
+
+
+def _scan_files(directory: str, suffixes: Tuple[str, ...],
+                exclude_dirs: FrozenSet[str] = EXCLUDE_DIRS) -> Iterator[str]:
+    """Yield files under directory whose lowercased name ends with a suffix.
+    
+    Walks in os.walk order using scandir's cached entry types, so listing a
+    tree costs no stat per file; symlinked files are included, symlinked
+    dirs not entered. Hidden directories and those named in exclude_dirs
+    are not entered either.
+    """
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    name = entry.name
+                    if name not in exclude_dirs and not name.startswith('.'):
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith(suffixes) and entry.is_file():
+                    yield entry.path
+    except OSError:
+        return  # Unreadable directory; os.walk skips these too
+    
+    for subdir in subdirs:
+        yield from _scan_files(subdir, suffixes, exclude_dirs)
+
+
+# The pool worker's ImageCompressor, built once by _init_worker
+_worker_compressor = None
+
+
+def _init_worker(auto_repair: bool) -> None:
+    """Pool initializer: build this process's ImageCompressor once.
+    
+    Shared by the batch, CLI and GUI pools. Nothing has to be pickled
+    across the process boundary, and the validation and repair caches last
+    for every file the worker handles instead of one; _compress_one_worker
+    keeps the memoized repairs when it cleans up after a file, and they are
+    removed at worker exit.
+    """
+    global _worker_compressor
+    _worker_compressor = ImageCompressor(auto_repair=auto_repair)
+    # Remove the memoized repairs when the worker shuts down
+    Finalize(_worker_compressor, _worker_compressor.cleanup_temp_files, exitpriority=0)
+
+
+def _compress_one_worker(input_path: str, output_path: str, kwargs: Dict) -> Dict:
+    """Process-pool entry point (must be module level): compress one file.
+    
+    kwargs are passed on to compress_image (quality_preset, target_format...).
+    """
+    compressor = _worker_compressor
+    try:
+        return compressor.compress_image(input_path, output_path, **kwargs)
+    finally:
+        # Repair temp files live in this process; don't leave them behind.
+        # The parent mirrors results itself, so they needn't pile up here.
+        compressor.cleanup_temp_files(keep_repair_cache=True)
+        compressor.processed_files.clear()
+        compressor.errors.clear()
+
 
+@lru_cache(maxsize=4096)
 def format_size(size_bytes: int) -> str:
     """Format file size in human readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} TB"
+    # One comparison per unit, no per-call list or repeated division;
+    # 1024 ** n is folded to a constant at compile time
+    if size_bytes < 1024:
+        return f"{size_bytes:.1f} B"  # Negative sizes (growth) stay in bytes too
+    if size_bytes < 1024 ** 2:
+        return f"{size_bytes / 1024:.1f} KB"
+    if size_bytes < 1024 ** 3:
+        return f"{size_bytes / 1024 ** 2:.1f} MB"
+    if size_bytes < 1024 ** 4:
+        return f"{size_bytes / 1024 ** 3:.1f} GB"
+    return f"{size_bytes / 1024 ** 4:.1f} TB"
 
 if __name__ == "__main__":
     # Example usage
@@ -8,7 +8,6 @@ import os
 import sys
 import tempfile
 import shutil
-import subprocess
 from pathlib import Path
 import json
 
@@ -16,6 +15,7 @@ import json
 sys.path.insert(0, str(Path(__file__).parent))
 
 from image_compressor import ImageCompressor
+from test_helpers import run_cli, truncated_copy
 from PIL import Image
 import numpy as np
 
@@ -25,19 +25,16 @@ def create_test_images(test_dir):
     
     # Create normal test image
     normal_path = test_dir / "normal.jpg"
-    arr = np.random.randint(0, 256, (100, 100, 3), dtype=np.uint8)
+    arr = np.frombuffer(np.random.default_rng().bytes(100 * 100 * 3),
+                        dtype=np.uint8).reshape(100, 100, 3)
     img = Image.fromarray(arr)
     img.save(normal_path, format='JPEG', quality=95)
     images['normal'] = normal_path
     
     # Create truncated (corrupted) image
     truncated_path = test_dir / "truncated.jpg"
-    with open(normal_path, 'rb') as src:
-        data = src.read()
     # Truncate to 70% of original size
-    truncated_data = data[:int(len(data) * 0.7)]
-    with open(truncated_path, 'wb') as dst:
-        dst.write(truncated_data)
+    truncated_copy(normal_path, truncated_path, int(os.path.getsize(normal_path) * 0.7))
     images['truncated'] = truncated_path
     
     # Create PNG image
@@ -95,30 +92,27 @@ def test_cli_interface(test_images, output_dir):
     print("\n⌨️  Testing CLI Interface")
     print("-" * 30)
     
-    python_exe = sys.executable
-    cli_script = Path(__file__).parent / "cli_compressor.py"
-    
     results = {}
     
     # Test with auto-repair (default behavior)
     print("1. Testing CLI with auto-repair (default)...")
     for name, path in test_images.items():
         output_path = output_dir / f"cli_{name}_default.jpg"
-        cmd = [python_exe, str(cli_script), str(path), "-o", str(output_dir), "--suffix", f"cli_{name}_default", "--quiet"]
+        cli_args = [path, "-o", output_dir, "--suffix", f"cli_{name}_default", "--quiet"]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(Path(__file__).parent))
-            success = result.returncode == 0
+            returncode, stdout, stderr = run_cli(cli_args)
+            success = returncode == 0
             results[f"cli_{name}_default"] = {
                 'success': success,
-                'stdout': result.stdout,
-                'stderr': result.stderr
+                'stdout': stdout,
+                'stderr': stderr
             }
             
             status = "✅ Success" if success else "❌ Failed"
             print(f"   {name}: {status}")
-            if not success and result.stderr:
-                print(f"      Error: {result.stderr.strip()}")
+            if not success and stderr:
+                print(f"      Error: {stderr.strip()}")
                 
         except Exception as e:
             print(f"   {name}: ❌ Exception - {str(e)}")
@@ -128,15 +122,15 @@ def test_cli_interface(test_images, output_dir):
     print("\n2. Testing CLI with --no-auto-repair...")
     for name, path in test_images.items():
         output_path = output_dir / f"cli_{name}_no_repair.jpg"
-        cmd = [python_exe, str(cli_script), str(path), "-o", str(output_dir), "--suffix", f"cli_{name}_no_repair", "--no-auto-repair", "--quiet"]
+        cli_args = [path, "-o", output_dir, "--suffix", f"cli_{name}_no_repair", "--no-auto-repair", "--quiet"]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(Path(__file__).parent))
-            success = result.returncode == 0
+            returncode, stdout, stderr = run_cli(cli_args)
+            success = returncode == 0
             results[f"cli_{name}_no_repair"] = {
                 'success': success,
-                'stdout': result.stdout,
-                'stderr': result.stderr
+                'stdout': stdout,
+                'stderr': stderr
             }
             
             status = "✅ Success" if success else "❌ Failed"
@@ -150,8 +144,8 @@ def test_cli_interface(test_images, output_dir):
 
 def analyze_results(api_results, cli_results):
     """Analyze and summarize test results."""
-    print("\n📊 Test Results Analysis")
-    print("=" * 50)
+    # Collect the report and write it once rather than line by line
+    out = ["\n📊 Test Results Analysis", "=" * 50]
     
     # Count successes and failures
     api_successes = sum(1 for r in api_results.values() if r['success'])
@@ -161,11 +155,11 @@ def analyze_results(api_results, cli_results):
     cli_successes = sum(1 for r in cli_results.values() if r['success'])
     cli_total = len(cli_results)
     
-    print(f"Python API: {api_successes}/{api_total} successful ({api_repairs} auto-repaired)")
-    print(f"CLI Interface: {cli_successes}/{cli_total} successful")
+    out.append(f"Python API: {api_successes}/{api_total} successful ({api_repairs} auto-repaired)")
+    out.append(f"CLI Interface: {cli_successes}/{cli_total} successful")
     
     # Analyze auto-repair effectiveness
-    print(f"\n🔧 Auto-Repair Analysis:")
+    out.append(f"\n🔧 Auto-Repair Analysis:")
     
     # Check if truncated images were handled differently
     truncated_with_repair = api_results.get('api_truncated_repaired', {})
@@ -176,25 +170,27 @@ def analyze_results(api_results, cli_results):
         no_repair_success = truncated_without_repair['success']
         
         if repair_success and not no_repair_success:
-            print("   ✅ Auto-repair successfully handled corrupted image")
+            out.append("   ✅ Auto-repair successfully handled corrupted image")
             if truncated_with_repair.get('was_auto_repaired'):
                 method = truncated_with_repair.get('repair_method', 'unknown')
-                print(f"   🔧 Repair method used: {method}")
+                out.append(f"   🔧 Repair method used: {method}")
         elif repair_success and no_repair_success:
-            print("   ⚠️  Both repair and no-repair succeeded (image may not be corrupted)")
+            out.append("   ⚠️  Both repair and no-repair succeeded (image may not be corrupted)")
         elif not repair_success and not no_repair_success:
-            print("   ❌ Both repair and no-repair failed (severe corruption)")
+            out.append("   ❌ Both repair and no-repair failed (severe corruption)")
         else:
-            print("   🤔 Unexpected result pattern")
+            out.append("   🤔 Unexpected result pattern")
     
     # Summary
-    print(f"\n📝 Summary:")
+    out.append(f"\n📝 Summary:")
     total_tests = api_total + cli_total
     total_successes = api_successes + cli_successes
     success_rate = (total_successes / total_tests) * 100 if total_tests > 0 else 0
     
-    print(f"   Overall success rate: {success_rate:.1f}% ({total_successes}/{total_tests})")
-    print(f"   Auto-repair functionality: {'✅ Working' if api_repairs > 0 else '⚠️  Not triggered'}")
+    out.append(f"   Overall success rate: {success_rate:.1f}% ({total_successes}/{total_tests})")
+    out.append(f"   Auto-repair functionality: {'✅ Working' if api_repairs > 0 else '⚠️  Not triggered'}")
+    
+    sys.stdout.write("\n".join(out) + "\n")
     
     return {
         'api_success_rate': (api_successes / api_total) * 100 if api_total > 0 else 0,
@@ -7,6 +7,19 @@ Easy launcher script for all compression tools.
 import sys
 import os
 import argparse
+import importlib.util
+
+def _require_pil():
+    """Exit with install instructions unless Pillow is available.
+    
+    Checked once a mode has been chosen, so --help and usage errors skip it;
+    find_spec locates the package without importing it (each mode imports
+    what it needs itself).
+    """
+    if importlib.util.find_spec('PIL') is None:
+        print("❌ Pillow not found. Please install: pip install Pillow")
+        sys.exit(1)
+    print("📦 Pillow found")
 
 def main():
     """Main launcher for image compression tools."""
@@ -35,6 +48,9 @@ Examples:
     
     args = parser.parse_args()
     
+    # Every mode works on images
+    _require_pil()
+    
     if args.mode == 'gui':
         # Launch GUI
         print("🚀 Launching Image Compressor GUI...")
@@ -126,14 +142,6 @@ Examples:
             sys.exit(1)
 
 if __name__ == "__main__":
-    # Check if all required modules are available
-    try:
-        import PIL
-        print("📦 Pillow found")
-    except ImportError:
-        print("❌ Pillow not found. Please install: pip install Pillow")
-        sys.exit(1)
-    
     # Check Python version
     if sys.version_info < (3, 7):
         print("❌ Python 3.7 or higher required")
@@ -13,16 +13,19 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from image_compressor import ImageCompressor
+from test_helpers import truncated_copy
 from PIL import Image
 import numpy as np
 
 def create_test_image(path, size=(100, 100), format='JPEG'):
     """Create a test image."""
-    # Create a simple test image with gradient
-    arr = np.zeros((size[1], size[0], 3), dtype=np.uint8)
-    for i in range(size[1]):
-        for j in range(size[0]):
-            arr[i, j] = [i % 256, j % 256, (i + j) % 256]
+    # Create a simple test image with gradient (rows, columns and their sum)
+    i = np.arange(size[1])[:, None]
+    j = np.arange(size[0])[None, :]
+    arr = np.empty((size[1], size[0], 3), dtype=np.uint8)
+    arr[..., 0] = i % 256
+    arr[..., 1] = j % 256
+    arr[..., 2] = (i + j) % 256
     
     img = Image.fromarray(arr)
     img.save(path, format=format, quality=95)
@@ -30,14 +33,8 @@ def create_test_image(path, size=(100, 100), format='JPEG'):
 
 def create_corrupted_image(source_path, corrupt_path):
     """Create a corrupted version of an image by truncating it."""
-    with open(source_path, 'rb') as src:
-        data = src.read()
-    
     # Truncate the image data (remove last 30% of data)
-    truncated_data = data[:int(len(data) * 0.7)]
-    
-    with open(corrupt_path, 'wb') as dst:
-        dst.write(truncated_data)
+    truncated_copy(source_path, corrupt_path, int(os.path.getsize(source_path) * 0.7))
     
     return corrupt_path
 
@@ -124,14 +121,16 @@ def test_auto_repair():
         compressor_no_repair.cleanup_temp_files()
         print("   ✅ Cleanup complete")
     
-    print("\n" + "=" * 50)
-    print("🎯 Auto-Repair Test Complete!")
-    
-    # Summary
-    print("\n📋 Summary:")
-    print(f"   Without auto-repair: {'✅ Handled gracefully' if not result_no_repair['success'] else '⚠️  Unexpected success'}")
-    print(f"   With auto-repair: {'✅ Successfully repaired' if result_with_repair['success'] and result_with_repair.get('was_auto_repaired') else '❌ Failed to repair'}")
-    print(f"   Normal image: {'✅ Processed normally' if result_normal['success'] and not result_normal.get('was_auto_repaired') else '❌ Unexpected behavior'}")
+    # Summary, written in one go
+    lines = [
+        "\n" + "=" * 50,
+        "🎯 Auto-Repair Test Complete!",
+        "\n📋 Summary:",
+        f"   Without auto-repair: {'✅ Handled gracefully' if not result_no_repair['success'] else '⚠️  Unexpected success'}",
+        f"   With auto-repair: {'✅ Successfully repaired' if result_with_repair['success'] and result_with_repair.get('was_auto_repaired') else '❌ Failed to repair'}",
+        f"   Normal image: {'✅ Processed normally' if result_normal['success'] and not result_normal.get('was_auto_repaired') else '❌ Unexpected behavior'}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     test_auto_repair()
\ No newline at end of file
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the test scripts.
+"""
+
+import io
+import logging
+import os
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+from cli_compressor import main as cli_main
+
+
+def truncated_copy(src_path, dst_path, length):
+    """Copy the first `length` bytes of src_path to dst_path."""
+    if hasattr(os, 'copy_file_range'):
+        # Linux: copy inside the kernel, no user-space buffer
+        src_fd = dst_fd = None
+        try:
+            src_fd = os.open(src_path, os.O_RDONLY)
+            dst_fd = os.open(dst_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            copied = 0
+            while copied < length:
+                n = os.copy_file_range(src_fd, dst_fd, length - copied)
+                if n == 0:
+                    break
+                copied += n
+            return
+        except OSError:
+            pass  # e.g. unsupported filesystem; fall through
+        finally:
+            for fd in (src_fd, dst_fd):
+                if fd is not None:
+                    os.close(fd)
+    
+    # Elsewhere stream through a 1 MB buffer rather than reading it all
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        remaining = length
+        while remaining:
+            chunk = src.read(min(1 << 20, remaining))
+            if not chunk:
+                break
+            dst.write(chunk)
+            remaining -= len(chunk)
+
+
+def run_cli(args):
+    """Run cli_compressor in this process, as main.py's cli mode does.
+    
+    Saves an interpreter start and Pillow import per case compared with
+    subprocess.run. Returns (exit code, stdout, stderr); log records are
+    captured with stderr, as they would be from a child process.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    handlers = [h for h in logging.getLogger().handlers if isinstance(h, logging.StreamHandler)]
+    saved_streams = [h.setStream(stderr) for h in handlers]
+    saved_argv = sys.argv
+    sys.argv = ['cli_compressor.py'] + [str(arg) for arg in args]
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                code = cli_main()
+            except SystemExit as e:  # argparse usage errors
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    finally:
+        sys.argv = saved_argv
+        for handler, stream in zip(handlers, saved_streams):
+            handler.setStream(stream)
+    return code, stdout.getvalue(), stderr.getvalue()